@@ -2,16 +2,68 @@
 Agent-based content analyzer using OpenAI Agents framework
 """
 import asyncio
-from agents import Agent, Runner
-from typing import List, Dict, Optional
-from config import AREAS_OF_INTEREST, AGENT_CONFIG
+import hashlib
+import json
+import warnings
+from agents import Agent
+from typing import List, Dict, Optional, Tuple
+from config import AREAS_OF_INTEREST, AREA_SYNONYMS, AGENT_CONFIG
+from analysis_cache import AnalysisCache
+from analyzer_backends import AnalyzerBackend, AgentsBackend
+from compressor import ContentCompressor, estimate_tokens
+from prefilter import KeywordPrefilter
+from rate_limiter import AdaptiveConcurrencyLimiter, TokenBucket
 import re
 
 class NewsAnalyzer:
-    def __init__(self):
+    # Defaults for AGENT_CONFIG keys that cut article text (as in config.py),
+    # shared so the prompt and the cache key always cut it the same way
+    DEFAULT_MAX_CONTENT_LENGTH = 20000
+    DEFAULT_MAX_CONTENT_TOKENS = 1000
+    
+    def __init__(self, backend: Optional[AnalyzerBackend] = None):
         self.areas_of_interest = AREAS_OF_INTEREST
         self.config = AGENT_CONFIG
         self.agent = self._create_agent()
+        self.backend = backend or AgentsBackend()
+        self.compressor = ContentCompressor(
+            KeywordPrefilter(self.areas_of_interest, AREA_SYNONYMS),
+            model=self.agent.model,
+            lead_passages=self.config.get("lead_passages", 2)
+        )
+        
+        # Shared across calls so concurrent batches draw from one budget
+        max_concurrency = self.config.get("max_concurrency", 8)
+        rpm = self.config.get("requests_per_minute", 500)
+        tpm = self.config.get("tokens_per_minute", 200000)
+        self.concurrency = AdaptiveConcurrencyLimiter(max_concurrency)
+        self.request_budget = TokenBucket(rpm / 60, burst=max_concurrency)
+        self.token_budget = TokenBucket(tpm / 60, burst=tpm // 6)  # At most ~10s of tokens at once
+        self._resume_at = 0.0  # Loop time before which no new request starts
+        
+        # Results are reused only for the same model, instructions, areas and
+        # passage selection (synonyms and lead passages decide what is sent)
+        self.cache: Optional[AnalysisCache] = None
+        if self.config.get("analysis_cache_path"):
+            self.cache = AnalysisCache(
+                self.config["analysis_cache_path"],
+                max_entries=self.config.get("analysis_cache_max_entries", 50000)
+            )
+        self.profile_fingerprint = hashlib.sha256("\n".join(
+            [self.agent.instructions] + self.areas_of_interest + [
+                json.dumps(AREA_SYNONYMS, sort_keys=True),
+                str(self.config.get("lead_passages", 2))
+            ]
+        ).encode("utf-8")).hexdigest()
+    
+    async def __aenter__(self):
+        if self.cache:
+            await self.cache.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.cache:
+            await self.cache.close()
     
     def _create_agent(self) -> Agent:
         """Create the news analysis agent"""
@@ -49,6 +101,137 @@ class NewsAnalyzer:
             model=self.config.get("model", "gpt-4o-mini"),
         )
     
+    def _compress(self, content: str, token_budget: Optional[int]) -> str:
+        """Content cut to `max_content_length` characters, then to `token_budget` tokens"""
+        max_length = self.config.get("max_content_length", self.DEFAULT_MAX_CONTENT_LENGTH)
+        # Stored articles can have NULL content
+        content = (content or "")[:max_length]
+        if not token_budget:
+            return content
+        return self.compressor.compress(content, token_budget)
+    
+    def _build_prompt(self, title: str, content: str, url: str) -> str:
+        """Build the analysis prompt for one article"""
+        # Compress content if too long (to save tokens)
+        compressed_content = self._compress(content, self.config.get("max_content_tokens", self.DEFAULT_MAX_CONTENT_TOKENS))
+        
+        return f"""
+        Analyze this news article for relevance to the areas of interest:
+        
+        Title: {title}
+        URL: {url}
+        Content: {compressed_content}
+        
+        Please provide your analysis in the required format:
+        RELEVANCE_SCORE: [0.0-1.0]
+        AREAS: [comma-separated list or "none"]
+        SUMMARY: [brief explanation]
+        """
+    
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        """Whether an API error means we are over the RPM/TPM limits"""
+        if type(error).__name__ == "RateLimitError":
+            return True
+        return getattr(error, "status_code", None) == 429
+    
+    def _backoff_delay(self, error: Exception, attempt: int) -> float:
+        """Seconds to pause after a rate-limit error (Retry-After if given)"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            retry_after = float(headers.get("retry-after"))
+            if retry_after > 0:
+                return retry_after
+        except (TypeError, ValueError):
+            pass
+        return min(60.0, self.config.get("backoff_base", 2.0) * (2 ** attempt))
+    
+    async def _wait_for_budget(self, estimated_tokens: int):
+        """Wait out any backoff pause, then take request and token budget"""
+        loop = asyncio.get_running_loop()
+        while loop.time() < self._resume_at:
+            await asyncio.sleep(self._resume_at - loop.time())
+        await self.request_budget.acquire()
+        await self.token_budget.acquire(estimated_tokens)
+    
+    async def _run_agent(self, prompt: str) -> str:
+        """Run the agent within the shared concurrency, RPM and TPM limits (raises on failure)"""
+        estimated_tokens = (
+            estimate_tokens(self.agent.instructions + prompt, self.agent.model)
+            + self.config.get("expected_output_tokens", 150)
+        )
+        max_retries = self.config.get("max_retries", 5)
+        
+        for attempt in range(max_retries + 1):
+            await self.concurrency.acquire()
+            try:
+                await self._wait_for_budget(estimated_tokens)
+                sent_at = self.concurrency.decreases
+                output = await self.backend.run(self.agent, prompt)
+            except Exception as e:
+                if self._is_rate_limit_error(e) and attempt < max_retries:
+                    await self.concurrency.on_overload(sent_at)
+                    loop = asyncio.get_running_loop()
+                    self._resume_at = max(self._resume_at, loop.time() + self._backoff_delay(e, attempt))
+                    continue
+                raise
+            finally:
+                await self.concurrency.release()
+            
+            await self.concurrency.on_success()
+            return output
+    
+    def _cache_key(self, title: str, content: str, content_tokens: Optional[int] = None) -> Optional[str]:
+        """
+        Cache key for an article, or None if caching is off
+        
+        `content_tokens` is the content budget of the request that would
+        analyze it (`max_content_tokens` for a request of its own), and is
+        part of the key: a packed request sees less of the article.
+        """
+        if not (self.cache and self.cache.is_open):
+            return None
+        
+        max_length = self.config.get("max_content_length", self.DEFAULT_MAX_CONTENT_LENGTH)
+        if content_tokens is None:
+            content_tokens = self.config.get("max_content_tokens", self.DEFAULT_MAX_CONTENT_TOKENS)
+        return AnalysisCache.make_key(
+            title, (content or "")[:max_length], self.agent.model,
+            f"{self.profile_fingerprint}:{content_tokens}"
+        )
+    
+    async def _cache_get(self, *keys: str) -> Optional[Dict]:
+        """Cached analysis under the first key that has one"""
+        cached = await self.cache.get(*keys)
+        if cached:
+            # The threshold isn't part of the key, so re-apply it
+            cached["relevant"] = cached["relevance_score"] >= self.config.get("relevance_threshold", 0.5)
+        return cached
+    
+    async def _analyze_uncached(
+        self,
+        title: str,
+        content: str,
+        url: str,
+        cache_key: Optional[str]
+    ) -> Dict[str, any]:
+        """Analyze one article with its own request, caching a successful result"""
+        try:
+            analysis = self._parse_analysis(await self._run_agent(self._build_prompt(title, content, url)))
+        except Exception as e:
+            print(f"Error analyzing article {url}: {str(e)}")
+            return {
+                "relevant": False,
+                "relevance_score": 0.0,
+                "areas_of_interest": [],
+                "summary": f"Analysis error: {str(e)}",
+                "analysis_error": True
+            }
+        
+        if cache_key:
+            await self.cache.put(cache_key, analysis)
+        return analysis
+    
     async def analyze_article(
         self,
         title: str,
@@ -66,35 +249,92 @@ class NewsAnalyzer:
                 "summary": str
             }
         """
-        # Truncate content if too long (to save tokens)
-        max_length = self.config.get("max_content_length", 5000)
-        truncated_content = content[:max_length] if len(content) > max_length else content
-        
-        prompt = f"""
-        Analyze this news article for relevance to the areas of interest:
-        
-        Title: {title}
-        URL: {url}
-        Content: {truncated_content}
-        
-        Please provide your analysis in the required format:
+        cache_key = self._cache_key(title, content)
+        cached = await self._cache_get(cache_key) if cache_key else None
+        if cached:
+            return cached
+        return await self._analyze_uncached(title, content, url, cache_key)
+    
+    def _packed_entry(self, article_id: str, article: Dict, content: str) -> str:
+        """One article's section of a packed prompt (`content` already compressed)"""
+        return f"""
+        === ARTICLE {article_id} ===
+        Title: {article.get("title", "")}
+        URL: {article.get("url", "")}
+        Content: {content}
+        """
+    
+    def _build_packed_prompt(self, entries: List[str], ids: List[str]) -> str:
+        """Build one prompt asking for a separate analysis of each packed article"""
+        return f"""
+        Analyze each of the following {len(entries)} news articles separately for relevance
+        to the areas of interest. Articles are independent; judge each one on its own.
+        {"".join(entries)}
+        Respond with exactly one block per article ({", ".join(ids)}), in this format:
+        ARTICLE_ID: [id]
         RELEVANCE_SCORE: [0.0-1.0]
         AREAS: [comma-separated list or "none"]
         SUMMARY: [brief explanation]
         """
+    
+    def _pack_articles(self, indices: List[int], articles: List[Dict]) -> Tuple[List[List[int]], Dict[int, str]]:
+        """
+        Greedily group articles so each packed prompt stays within the token budget
         
+        Also returns each article's compressed content, so it is only
+        compressed once.
+        """
+        budget = self.config.get("packed_batch_tokens", 6000)
+        max_articles = self.config.get("packed_max_articles", 10)
+        content_tokens = self.config.get("packed_content_tokens", 400)
+        
+        groups: List[List[int]] = []
+        contents: Dict[int, str] = {}
+        current: List[int] = []
+        current_tokens = 0
+        for index in indices:
+            contents[index] = self._compress(articles[index].get("content") or "", content_tokens)
+            tokens = estimate_tokens(self._packed_entry("A00", articles[index], contents[index]), self.agent.model)
+            if current and (current_tokens + tokens > budget or len(current) >= max_articles):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups, contents
+    
+    def _parse_packed_analysis(self, analysis_text: str, ids: List[str]) -> Dict[str, Dict]:
+        """Parse per-article blocks from a packed response, keyed by article ID"""
+        results = {}
+        for block in re.split(r'(?m)^\s*ARTICLE_ID:\s*', analysis_text)[1:]:
+            first_line, _, rest = block.partition('\n')
+            article_id = first_line.strip().strip('[]').strip()
+            # Only accept blocks that actually carry a score for a known ID
+            if article_id in ids and article_id not in results and 'RELEVANCE_SCORE:' in rest:
+                results[article_id] = self._parse_analysis(rest)
+        return results
+    
+    async def _analyze_packed(self, articles: List[Dict], contents: List[str]) -> List[Optional[Dict]]:
+        """
+        Analyze several articles (with their compressed contents) in one request
+        
+        Returns one analysis per article, or None where the response had no
+        usable block for it (or the whole request failed).
+        """
+        ids = [f"A{i + 1}" for i in range(len(articles))]
+        entries = [
+            self._packed_entry(article_id, article, content)
+            for article_id, article, content in zip(ids, articles, contents)
+        ]
         try:
-            result = await Runner.run(self.agent, input=prompt)
-            analysis = self._parse_analysis(result.final_output)
-            return analysis
+            output = await self._run_agent(self._build_packed_prompt(entries, ids))
         except Exception as e:
-            print(f"Error analyzing article {url}: {str(e)}")
-            return {
-                "relevant": False,
-                "relevance_score": 0.0,
-                "areas_of_interest": [],
-                "summary": f"Analysis error: {str(e)}"
-            }
+            print(f"Error analyzing packed batch of {len(articles)} articles: {str(e)}")
+            return [None] * len(articles)
+        
+        parsed = self._parse_packed_analysis(output, ids)
+        return [parsed.get(article_id) for article_id in ids]
     
     def _parse_analysis(self, analysis_text: str) -> Dict:
         """Parse the agent's analysis output"""
@@ -152,31 +392,97 @@ class NewsAnalyzer:
             "summary": summary
         }
     
-    async def analyze_batch(self, articles: List[Dict], rate_limit: float = 0.5) -> List[Dict]:
-        """Analyze multiple articles with rate limiting"""
-        analyzed_articles = []
+    async def analyze_batch(
+        self,
+        articles: List[Dict],
+        rate_limit: Optional[float] = None,
+        show_progress: bool = True
+    ) -> List[Dict]:
+        """
+        Analyze multiple articles concurrently
         
-        for i, article in enumerate(articles):
-            if i > 0:
-                await asyncio.sleep(rate_limit)  # Rate limit API calls
-            
-            analysis = await self.analyze_article(
-                title=article.get("title", ""),
-                content=article.get("content", ""),
-                url=article.get("url", "")
+        Up to `max_concurrency` requests run at once, within the
+        `requests_per_minute` and `tokens_per_minute` budgets. Rate-limit
+        errors halve the concurrency and pause new requests; it then grows
+        back one slot at a time. With `packed_batch_tokens` set, several
+        articles share each request, and any article missing from a packed
+        response is re-analyzed on its own. Results keep the input order.
+        
+        `rate_limit` (the old fixed pause between requests) is deprecated
+        and ignored; pacing comes from AGENT_CONFIG.
+        """
+        if rate_limit is not None:
+            warnings.warn(
+                "analyze_batch(rate_limit=...) is ignored; set requests_per_minute in AGENT_CONFIG instead",
+                DeprecationWarning, stacklevel=2
             )
-            
+        analyzed_articles: List[Optional[Dict]] = [None] * len(articles)
+        completed = 0
+        
+        def finish(index: int, analysis: Dict):
+            nonlocal completed
             # Merge analysis with article data
-            analyzed_article = {
-                **article,
+            analyzed_articles[index] = {
+                **articles[index],
                 **analysis
             }
-            analyzed_articles.append(analyzed_article)
             
             # Print progress
-            if (i + 1) % 10 == 0:
-                print(f"Analyzed {i + 1}/{len(articles)} articles...")
+            completed += 1
+            if show_progress and completed % 10 == 0:
+                print(f"Analyzed {completed}/{len(articles)} articles... (concurrency {self.concurrency.limit})")
+        
+        async def analyze_one(index: int, cache_key: Optional[str]):
+            article = articles[index]
+            finish(index, await self._analyze_uncached(
+                title=article.get("title", ""),
+                content=article.get("content") or "",
+                url=article.get("url", ""),
+                cache_key=cache_key
+            ))
         
+        async def analyze_group(group: List[int]):
+            if len(group) == 1:
+                await analyze_one(group[0], cache_keys[group[0]])
+                return
+            results = await self._analyze_packed([articles[i] for i in group], [contents[i] for i in group])
+            retry = []
+            for index, analysis in zip(group, results):
+                if analysis is None:
+                    retry.append(index)
+                    continue
+                if packed_keys.get(index):
+                    await self.cache.put(packed_keys[index], analysis)
+                finish(index, analysis)
+            # Fall back to individual requests for anything the packed reply missed
+            await asyncio.gather(*(analyze_one(index, cache_keys[index]) for index in retry))
+        
+        # Serve what we can from the cache first. Packed answers are cached
+        # under their own key; either kind of answer is reused here
+        packing = bool(self.config.get("packed_batch_tokens"))
+        cache_keys: Dict[int, Optional[str]] = {}
+        packed_keys: Dict[int, Optional[str]] = {}
+        pending = []
+        for i, article in enumerate(articles):
+            title, content = article.get("title", ""), article.get("content") or ""
+            cache_key = self._cache_key(title, content)
+            cached = None
+            if cache_key:
+                keys = [cache_key]
+                if packing:
+                    packed_keys[i] = self._cache_key(title, content, self.config.get("packed_content_tokens", 400))
+                    keys.append(packed_keys[i])
+                cached = await self._cache_get(*keys)
+            if cached:
+                finish(i, cached)
+            else:
+                cache_keys[i] = cache_key
+                pending.append(i)
+        
+        contents: Dict[int, str] = {}
+        if packing:
+            groups, contents = self._pack_articles(pending, articles)
+        else:
+            groups = [[i] for i in pending]
+        await asyncio.gather(*(analyze_group(group) for group in groups))
         return analyzed_articles
-
-
@@ -0,0 +1,134 @@
+"""
+Persistent cache of LLM analysis results keyed by article content
+"""
+import hashlib
+import json
+import re
+import time
+from typing import Dict, Optional
+import aiosqlite
+
+class AnalysisCache:
+    TOUCH_BATCH_SIZE = 500
+
+    def __init__(self, path: str = "analysis_cache.db", max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db: Optional[aiosqlite.Connection] = None
+        self._size = 0
+        self._touched: Dict[str, float] = {}  # last_used updates from hits, written in batches
+
+    @property
+    def is_open(self) -> bool:
+        return self._db is not None
+
+    async def open(self):
+        """Open (and create if needed) the cache database"""
+        self._db = await aiosqlite.connect(self.path)
+        async with self._db.execute("PRAGMA journal_mode = WAL") as cursor:
+            await cursor.fetchall()
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        await self._db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_cache_last_used ON analysis_cache(last_used)
+        """)
+        await self._db.commit()
+        async with self._db.execute("SELECT COUNT(*) FROM analysis_cache") as cursor:
+            self._size = (await cursor.fetchone())[0]
+
+    async def close(self):
+        """Close the cache database"""
+        if self._db:
+            await self._write_touched()
+            await self._db.commit()
+            await self._db.close()
+            self._db = None
+
+    @staticmethod
+    def make_key(title: str, content: str, model: str, profile: str) -> str:
+        """
+        Cache key for an analysis
+
+        Title and content are normalised (case and whitespace) so that
+        syndicated copies of a story share a key regardless of URL.
+        `profile` should fingerprint everything else that shapes the
+        answer, i.e. the instructions and areas of interest.
+        """
+        normalised_title = re.sub(r"\s+", " ", title or "").strip().lower()
+        normalised_content = re.sub(r"\s+", " ", content or "").strip()
+        key_material = "\x1f".join([model, profile, normalised_title, normalised_content])
+        return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+    async def get(self, *keys: str) -> Optional[Dict]:
+        """Cached analysis for the first of `keys` that has one, or None (one hit or miss)"""
+        for key in keys:
+            async with self._db.execute(
+                "SELECT result FROM analysis_cache WHERE key = ?", (key,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is not None:
+                break
+        else:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touched[key] = time.time()
+        if len(self._touched) >= self.TOUCH_BATCH_SIZE:
+            await self._write_touched()
+            await self._db.commit()
+        return json.loads(row[0])
+
+    async def _write_touched(self):
+        """Write pending last_used updates (the caller commits)"""
+        if self._touched:
+            await self._db.executemany(
+                "UPDATE analysis_cache SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._touched.clear()
+
+    async def put(self, key: str, analysis: Dict):
+        """Store an analysis, evicting least recently used entries when full"""
+        async with self._db.execute(
+            "INSERT OR IGNORE INTO analysis_cache (key, result, last_used) VALUES (?, ?, ?)",
+            (key, json.dumps(analysis), time.time())
+        ) as cursor:
+            if cursor.rowcount > 0:
+                self._size += 1
+        # Committed with this insert, and written before eviction picks by last_used
+        await self._write_touched()
+
+        if self.max_entries and self._size > self.max_entries:
+            # Evict a tenth at a time so this doesn't run on every insert
+            excess = self._size - self.max_entries + max(1, self.max_entries // 10)
+            await self._db.execute("""
+                DELETE FROM analysis_cache WHERE key IN (
+                    SELECT key FROM analysis_cache ORDER BY last_used LIMIT ?
+                )
+            """, (excess,))
+            async with self._db.execute("SELECT COUNT(*) FROM analysis_cache") as cursor:
+                new_size = (await cursor.fetchone())[0]
+            self.evictions += self._size - new_size
+            self._size = new_size
+
+        await self._db.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this session"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": self._size
+        }
@@ -0,0 +1,162 @@
+"""
+Backends that run analysis prompts: the OpenAI Agents runner and a local stand-in
+"""
+import asyncio
+import hashlib
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+class AnalyzerBackend(ABC):
+    """Runs one prompt against an agent and returns the reply text (raises on failure)"""
+
+    @abstractmethod
+    async def run(self, agent, prompt: str) -> str:
+        """The agent's reply to `prompt`"""
+
+class AgentsBackend(AnalyzerBackend):
+    """The OpenAI Agents SDK (the default)"""
+
+    async def run(self, agent, prompt: str) -> str:
+        from agents import Runner
+        result = await Runner.run(agent, input=prompt)
+        return result.final_output
+
+class FakeRateLimitError(Exception):
+    """Mimics openai.RateLimitError closely enough for NewsAnalyzer's retry logic"""
+
+    status_code = 429
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__("Rate limit reached (simulated)")
+        headers = {"retry-after": str(retry_after)} if retry_after else {}
+        self.response = type("Response", (), {"headers": headers})()
+
+class FakeBackend(AnalyzerBackend):
+    """
+    Deterministic local stand-in for the OpenAI API
+
+    Each call sleeps for `latency` +/- `jitter` seconds, then fails with
+    probability `error_rate`, returns a 429 with probability
+    `rate_limit_rate` (or whenever more than `capacity` calls are in
+    flight), and otherwise answers in the analyzer's format, including
+    packed prompts, naming some of `areas` when it scores an article
+    as relevant. Outcomes depend only on `seed`, the prompt and how
+    often that prompt has been tried, so runs are repeatable regardless
+    of scheduling. Latency and concurrency are recorded for stats().
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.2,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        capacity: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        areas: Optional[List[str]] = None,
+        seed: int = 0
+    ):
+        self.areas = list(areas or [])
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        """Clear recorded stats"""
+        self.attempts: Dict[str, int] = {}
+        self.latencies: List[float] = []
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._busy_time = 0.0  # Sum of in_flight over time, for the average
+        self._last_change = None
+        self.started = None
+        self.finished = None
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        attempt = self.attempts.get(digest, 0)
+        self.attempts[digest] = attempt + 1
+        return random.Random(f"{self.seed}:{digest}:{attempt}")
+
+    def _track(self, delta: int):
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now
+        if self._last_change is not None:
+            self._busy_time += self.in_flight * (now - self._last_change)
+        self._last_change = now
+        self.in_flight += delta
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.finished = now
+
+    def _reply(self, rng: random.Random, prompt: str) -> str:
+        areas = self.areas
+
+        def block() -> str:
+            score = round(rng.random(), 2)
+            chosen = rng.sample(areas, k=min(len(areas), rng.randint(1, 2))) if areas and score >= 0.5 else []
+            return (
+                f"RELEVANCE_SCORE: {score:.2f}\n"
+                f"AREAS: {', '.join(chosen) if chosen else 'none'}\n"
+                f"SUMMARY: Simulated analysis."
+            )
+
+        ids = re.findall(r"=== ARTICLE (\w+) ===", prompt)
+        if not ids:
+            return block()
+        return "\n".join(f"ARTICLE_ID: {article_id}\n{block()}" for article_id in ids)
+
+    async def run(self, agent, prompt: str) -> str:
+        rng = self._rng(prompt)
+        self.calls += 1
+        self._track(+1)
+        started = time.monotonic()
+        try:
+            if self.capacity is not None and self.in_flight > self.capacity:
+                self.rate_limited += 1
+                raise FakeRateLimitError(self.retry_after)
+            await asyncio.sleep(max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter)))
+            roll = rng.random()
+            if roll < self.rate_limit_rate:
+                self.rate_limited += 1
+                raise FakeRateLimitError(self.retry_after)
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.errors += 1
+                raise RuntimeError("Simulated API error")
+            return self._reply(rng, prompt)
+        finally:
+            self.latencies.append(time.monotonic() - started)
+            self._track(-1)
+
+    def stats(self) -> Dict:
+        """Call counts, concurrency and latency percentiles since the last reset"""
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        elapsed = (self.finished - self.started) if self.started is not None else 0.0
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "peak_concurrency": self.peak_in_flight,
+            "mean_concurrency": self._busy_time / elapsed if elapsed else 0.0,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": latencies[-1] if latencies else 0.0
+        }
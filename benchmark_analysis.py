@@ -0,0 +1,149 @@
+"""
+Offline throughput benchmark of analysis and the processing pipeline
+
+Runs NewsAnalyzer.analyze_batch and main.process_articles on synthetic
+articles against FakeBackend, a local stand-in for the OpenAI API, so no
+API key or network is needed. The RPM/TPM budgets are lifted so the fake
+API's latency and 429s set the pace; concurrency and packing follow
+AGENT_CONFIG.
+
+Usage:
+    python benchmark_analysis.py [sizes] [latency] [error_rate] [rate_limit_rate] [capacity]
+
+    sizes            Comma-separated article counts (default: 1000,10000)
+    latency          Seconds per simulated request, +/- 40% jitter (default: 0.5)
+    error_rate       Share of requests failing with an API error (default: 0.01)
+    rate_limit_rate  Share of requests answered with a 429 (default: 0.02)
+    capacity         Concurrent requests the fake API accepts before 429s (default: unlimited)
+"""
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from config import AGENT_CONFIG, AREAS_OF_INTEREST, AREA_SYNONYMS
+from agent_analyzer import NewsAnalyzer
+from analyzer_backends import FakeBackend
+from database import NewsDatabase
+
+FILLER = (
+    "the a officials said on report new year week government company people market "
+    "according statement plans percent local country global public data system policy "
+    "announced expected further during while after before between support official"
+).split()
+
+def make_articles(count: int, seed: int = 0) -> List[Dict]:
+    """
+    Synthetic articles: roughly 300 words each, about half mentioning an
+    area of interest, and one in ten a reworded copy of an earlier one
+    """
+    rng = random.Random(seed)
+    terms = [term.rstrip("*") for area in AREAS_OF_INTEREST for term in [area] + AREA_SYNONYMS.get(area, [])]
+    articles = []
+    for i in range(count):
+        source = f"Benchmark Source {i % 50}"
+        if articles and rng.random() < 0.1:
+            original = rng.choice(articles)
+            words = original["content"].split()
+            words[rng.randrange(len(words))] = rng.choice(FILLER)
+            content = " ".join(words)
+        else:
+            topical = rng.random() < 0.5
+            words = [
+                rng.choice(terms) if topical and rng.random() < 0.03 else rng.choice(FILLER) + str(rng.randrange(200))
+                for _ in range(300)
+            ]
+            content = "\n".join(" ".join(words[j:j + 50]) + "." for j in range(0, len(words), 50))
+        articles.append({
+            "url": f"https://benchmark.invalid/{i}",
+            "title": f"Benchmark article {i}",
+            "content": content,
+            "source": source,
+            "date": None
+        })
+    return articles
+
+def print_stats(label: str, count: int, elapsed: float, backend: FakeBackend, final_limit: Optional[int] = None):
+    stats = backend.stats()
+    print(f"{label}:")
+    print(f"  {count} articles in {elapsed:.1f}s ({count / elapsed:.0f} articles/s)")
+    print(f"  Requests: {stats['calls']} ({stats['calls'] / elapsed:.1f}/s), "
+          f"{stats['rate_limited']} rate-limited, {stats['errors']} errors")
+    limit = f", final limit {final_limit}" if final_limit is not None else ""
+    print(f"  Concurrency: peak {stats['peak_concurrency']}, mean {stats['mean_concurrency']:.1f}{limit}")
+    print(f"  Request latency: p50 {stats['p50'] * 1000:.0f}ms, p95 {stats['p95'] * 1000:.0f}ms, "
+          f"p99 {stats['p99'] * 1000:.0f}ms, max {stats['max'] * 1000:.0f}ms")
+
+async def benchmark_analyze_batch(articles: List[Dict], backend: FakeBackend):
+    """analyze_batch on its own"""
+    backend.reset()
+    async with NewsAnalyzer(backend=backend) as analyzer:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            await analyzer.analyze_batch(articles)
+        elapsed = time.perf_counter() - started
+        print_stats("analyze_batch", len(articles), elapsed, backend, analyzer.concurrency.limit)
+
+async def scraped_sources(articles: List[Dict]) -> AsyncIterator[Tuple[Dict, List[Dict], None]]:
+    """The synthetic articles as scrape results, one per source"""
+    by_source: Dict[str, List[Dict]] = {}
+    for article in articles:
+        by_source.setdefault(article["source"], []).append(article)
+    for name, source_articles in by_source.items():
+        yield {"name": name}, source_articles, None
+
+async def benchmark_pipeline(articles: List[Dict], backend: FakeBackend):
+    """Dedup, pre-filter, analysis and storage (main.process_articles) on a fresh database"""
+    from main import process_articles
+
+    backend.reset()
+    with tempfile.TemporaryDirectory() as directory:
+        async with NewsDatabase(os.path.join(directory, "benchmark.db")) as db:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                await process_articles(db, scraped_sources(articles), backend=backend)
+            elapsed = time.perf_counter() - started
+            stats = await db.get_statistics()
+    print_stats("process_articles", len(articles), elapsed, backend)
+    print(f"  Stored: {stats['total_articles']} articles, {stats['relevant_articles']} relevant")
+
+async def main():
+    sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1000, 10000]
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    error_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+    rate_limit_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.02
+    capacity = int(sys.argv[5]) if len(sys.argv) > 5 else None
+
+    # Measure the pipeline against the fake API, not the cache or the budgets
+    AGENT_CONFIG["analysis_cache_path"] = None
+    AGENT_CONFIG["requests_per_minute"] = 10 ** 7
+    AGENT_CONFIG["tokens_per_minute"] = 10 ** 10
+    AGENT_CONFIG["backoff_base"] = min(AGENT_CONFIG.get("backoff_base", 2.0), latency)
+
+    backend = FakeBackend(
+        latency=latency,
+        jitter=latency * 0.4,
+        error_rate=error_rate,
+        rate_limit_rate=rate_limit_rate,
+        capacity=capacity,
+        areas=AREAS_OF_INTEREST
+    )
+    print(f"Fake API: {latency * 1000:.0f}ms +/- 40% latency, {error_rate:.0%} errors, "
+          f"{rate_limit_rate:.0%} rate-limited, capacity {capacity or 'unlimited'}")
+    print(f"Analyzer: up to {AGENT_CONFIG.get('max_concurrency')} concurrent requests, "
+          f"packing {'on' if AGENT_CONFIG.get('packed_batch_tokens') else 'off'}")
+
+    for size in sizes:
+        articles = make_articles(size)
+        print("\n" + "=" * 60)
+        print(f"{size} articles")
+        print("=" * 60)
+        await benchmark_analyze_batch(articles, backend)
+        await benchmark_pipeline(articles, backend)
+
+if __name__ == "__main__":
+    asyncio.run(main())
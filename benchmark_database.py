@@ -0,0 +1,192 @@
+"""
+Query-plan benchmark of article listings on a large synthetic archive
+
+Seeds a temporary database with synthetic articles, then checks with
+EXPLAIN QUERY PLAN that every get_relevant_articles variant (with and
+without a source, at several score thresholds) reads rows in index order
+with no temp B-tree sort, and times each one. For comparison it also times
+the plan used before the composite indexes (the relevance_score index plus
+a sort), get_statistics against the full-table counts it replaced, and
+a deep keyset page (get_articles_page) against the same page by OFFSET.
+Exits with an error if any listing or page query needs a sort.
+
+Usage:
+    python benchmark_database.py [rows] [repeat]
+
+    rows    Synthetic articles to seed (default: 1000000)
+    repeat  Timed runs per query, the median is reported (default: 5)
+"""
+import asyncio
+import hashlib
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+from database import NewsDatabase, compress_content
+
+SOURCES = [f"Benchmark Source {i}" for i in range(200)]
+THRESHOLDS = [0.0, 0.5, 0.7, 0.9]
+LIMITS = [10, 100]
+
+def synthetic_rows(count: int, seed: int = 0) -> Iterator[Tuple]:
+    """Articles spread over two years, oldest first; one in ten is still unanalyzed"""
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=730)
+    step = timedelta(days=730) / max(1, count)
+    for i in range(count):
+        url = f"https://benchmark.invalid/{i}"
+        title = f"Benchmark article {i}"
+        analyzed = rng.random() >= 0.1
+        yield (
+            url, title, rng.choice(SOURCES), None,
+            (start + step * i).isoformat(), round(rng.random(), 2) if analyzed else None,
+            "cybersecurity" if analyzed else None, "Synthetic summary" if analyzed else None,
+            hashlib.md5(f"{url}{title}".encode()).hexdigest(), int(analyzed)
+        )
+
+def seed(path: str, count: int):
+    """Insert `count` synthetic articles in large transactions"""
+    conn = sqlite3.connect(path)
+    rows = synthetic_rows(count)
+    while True:
+        chunk = [row for _, row in zip(range(50000), rows)]
+        if not chunk:
+            break
+        conn.executemany("""
+            INSERT INTO articles
+            (url, title, source, published_date, scraped_date,
+             relevance_score, areas_of_interest, summary, hash, processed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, chunk)
+        conn.executemany(
+            "INSERT INTO article_contents (article_id, content) SELECT id, ? FROM articles WHERE hash = ?",
+            [(compress_content(f"Synthetic content of {row[1]}."), row[8]) for row in chunk]
+        )
+        conn.executemany(
+            "INSERT INTO articles_fts (rowid, title, summary, content) SELECT id, title, summary, ? FROM articles WHERE hash = ?",
+            [(f"Synthetic content of {row[1]}.", row[8]) for row in chunk]
+        )
+        conn.commit()
+    # Give the planner real statistics, as a long-lived archive would have
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+def query_plan(conn: sqlite3.Connection, sql: str, params: tuple) -> List[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+def with_index(sql: str, index: str) -> str:
+    """The same query forced onto one index (the pre-composite plan)"""
+    return sql.replace("FROM articles", f"FROM articles INDEXED BY {index}", 1)
+
+async def median_ms_async(run, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def median_ms(run, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+async def benchmark(path: str, repeat: int) -> List[str]:
+    """Time each listing and page variant; returns the queries whose plan sorts"""
+    failures = []
+    conn = sqlite3.connect(path)
+    async with NewsDatabase(path) as db:
+        print(f"{'query':<44} {'new':>10} {'previous':>10}  plan")
+        for source in (None, SOURCES[0]):
+            for min_relevance in THRESHOLDS:
+                for limit in LIMITS:
+                    sql, params = db._relevant_articles_query(limit, min_relevance, source)
+                    plan = query_plan(conn, sql, params)
+                    if any("TEMP B-TREE" in step for step in plan):
+                        failures.append(f"{sql.split()} {params}: {plan}")
+
+                    elapsed_ms = await median_ms_async(
+                        lambda: db.get_relevant_articles(limit=limit, min_relevance=min_relevance, source=source),
+                        repeat
+                    )
+                    previous_ms = median_ms(
+                        lambda: conn.execute(with_index(sql, "idx_relevance_score"), params).fetchall(), repeat
+                    )
+
+                    label = f"score >= {min_relevance}, limit {limit}" + (", one source" if source else "")
+                    print(f"{label:<44} {elapsed_ms:>8.2f}ms {previous_ms:>8.1f}ms  {'; '.join(plan)}")
+
+        # Counters maintained on insert versus counting every row
+        elapsed_ms = await median_ms_async(db.get_statistics, repeat)
+        previous_ms = median_ms(lambda: (
+            conn.execute("SELECT COUNT(*) FROM articles").fetchone(),
+            conn.execute("SELECT COUNT(*) FROM articles WHERE relevance_score >= 0.5").fetchone(),
+            conn.execute("SELECT source, COUNT(*) FROM articles GROUP BY source").fetchall()
+        ), repeat)
+        print(f"{'get_statistics':<44} {elapsed_ms:>8.2f}ms {previous_ms:>8.1f}ms")
+
+        # A page 90% of the way through the matches: keyset seek versus OFFSET
+        for source in (None, SOURCES[0]):
+            for min_relevance in (None, 0.7):
+                sql, params = db._page_query(LIMITS[-1], min_relevance, source)
+                matches = conn.execute(f"SELECT COUNT(*) FROM ({sql.replace('LIMIT ?', '')})", params[:-1]).fetchone()[0]
+                offset = int(matches * 0.9)
+                cutoff = conn.execute(
+                    f"SELECT scraped_date, id FROM ({sql.replace('LIMIT ?', 'LIMIT 1 OFFSET ?')})",
+                    params[:-1] + [offset]
+                ).fetchone()
+                if not cutoff:
+                    continue
+                after = f"{cutoff[0]},{cutoff[1]}"
+                sql, params = db._page_query(LIMITS[-1], min_relevance, source, after)
+                plan = query_plan(conn, sql, tuple(params))
+                if any("TEMP B-TREE" in step for step in plan):
+                    failures.append(f"{sql.split()} {params}: {plan}")
+
+                elapsed_ms = await median_ms_async(
+                    lambda: db.get_articles_page(LIMITS[-1], min_relevance, source, after), repeat
+                )
+                offset_sql, offset_params = db._page_query(LIMITS[-1], min_relevance, source)
+                previous_ms = median_ms(lambda: conn.execute(
+                    offset_sql.replace("LIMIT ?", "LIMIT ? OFFSET ?"), offset_params + [offset]
+                ).fetchall(), repeat)
+
+                label = (f"page at row {offset}" + (f", score >= {min_relevance}" if min_relevance is not None else "")
+                         + (", one source" if source else ""))
+                print(f"{label:<44} {elapsed_ms:>8.2f}ms {previous_ms:>8.1f}ms  {'; '.join(plan)}")
+    conn.close()
+    return failures
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.db")
+        # Create the schema (and indexes) the same way the application does
+        async with NewsDatabase(path):
+            pass
+        started = time.perf_counter()
+        seed(path, count)
+        print(f"Seeded {count} articles in {time.perf_counter() - started:.1f}s\n")
+
+        failures = await benchmark(path, repeat)
+
+    if failures:
+        print("\nQueries sorting in a temp B-tree:")
+        for failure in failures:
+            print(f"  {failure}")
+        raise AssertionError(f"{len(failures)} listing queries use a temp B-tree sort")
+    print("\nNo listing or page query uses a temp B-tree sort")
+
+if __name__ == "__main__":
+    asyncio.run(main())
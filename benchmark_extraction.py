@@ -0,0 +1,120 @@
+"""
+Side-by-side benchmark of the lxml and BeautifulSoup article extraction engines
+
+Usage:
+    python benchmark_extraction.py save [dir] [num_sources]   # Save article pages from HTML sources
+    python benchmark_extraction.py [dir] [repeat]             # Benchmark both engines on saved pages
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+from config import NEWS_SOURCES
+from parsing import parse_article_content_lxml, parse_article_content_soup
+
+DEFAULT_DIR = "benchmark_pages"
+MANIFEST = "pages.json"
+
+async def save_pages(directory: str, num_sources: int):
+    """Download article pages from the first HTML sources into `directory`"""
+    from scraper import NewsScraper
+
+    os.makedirs(directory, exist_ok=True)
+    html_sources = [s for s in NEWS_SOURCES if not s.get("is_rss")][:num_sources]
+    manifest = {}
+
+    async with NewsScraper() as scraper:
+        # Always download in full, a 304 would leave nothing to save
+        scraper.http_cache = None
+        for source_config in html_sources:
+            homepage = await scraper.fetch_raw(source_config["url"])
+            if not homepage:
+                continue
+            links = scraper.extract_article_links(homepage, source_config)[:5]
+            pages = await asyncio.gather(*(scraper.fetch_raw(link) for link in links))
+            for page in pages:
+                if not page:
+                    continue
+                filename = f"{len(manifest):04d}.html"
+                with open(os.path.join(directory, filename), "wb") as f:
+                    f.write(page)
+                manifest[filename] = source_config["name"]
+            print(f"Saved {len(manifest)} pages ({source_config['name']})")
+
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+def load_pages(directory: str) -> List[Tuple[str, bytes, Dict]]:
+    """Saved pages with the source config each one came from"""
+    manifest_path = os.path.join(directory, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    sources = {s["name"]: s for s in NEWS_SOURCES}
+
+    pages = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith((".html", ".htm")):
+            continue
+        with open(os.path.join(directory, filename), "rb") as f:
+            html = f.read()
+        source_config = sources.get(manifest.get(filename), {"url": "", "selectors": {}})
+        pages.append((filename, html, source_config))
+    return pages
+
+def run_benchmark(directory: str, repeat: int):
+    """Time both engines over every saved page and compare their output"""
+    pages = load_pages(directory)
+    if not pages:
+        print(f"No saved pages in {directory}. Run: python benchmark_extraction.py save {directory}")
+        return
+
+    total_bytes = sum(len(html) for _, html, _ in pages)
+    print("=" * 60)
+    print(f"Extraction benchmark: {len(pages)} pages, {total_bytes / 1024:.0f} KiB, {repeat} repeats")
+    print("=" * 60)
+
+    results = {}
+    for name, extract in [("bs4", parse_article_content_soup), ("lxml", parse_article_content_lxml)]:
+        timings = []
+        outputs = {}
+        for filename, html, source_config in pages:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                outputs[filename] = extract(html, source_config)
+            timings.append((time.perf_counter() - start) / repeat)
+        results[name] = outputs
+        timings.sort()
+        total = sum(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{name:>5}: total {total * 1000:8.1f} ms | "
+              f"mean {total / len(timings) * 1000:6.2f} ms | "
+              f"p95 {p95 * 1000:6.2f} ms | "
+              f"{total_bytes / 1024 / 1024 / total:6.1f} MiB/s")
+
+    # Agreement between engines, field by field
+    print("-" * 60)
+    for field in ("title", "content", "date"):
+        same = sum(1 for f in results["bs4"] if results["bs4"][f][field] == results["lxml"][f][field])
+        print(f"{field:>7} identical: {same}/{len(pages)}")
+    differing = [f for f in results["bs4"] if results["bs4"][f] != results["lxml"][f]]
+    if differing:
+        print(f"Pages with differences: {', '.join(differing[:10])}{' ...' if len(differing) > 10 else ''}")
+
+def main():
+    """Main function"""
+    args = sys.argv[1:]
+    if args and args[0] == "save":
+        directory = args[1] if len(args) > 1 else DEFAULT_DIR
+        num_sources = int(args[2]) if len(args) > 2 else 10
+        asyncio.run(save_pages(directory, num_sources))
+    else:
+        directory = args[0] if args else DEFAULT_DIR
+        repeat = int(args[1]) if len(args) > 1 else 5
+        run_benchmark(directory, repeat)
+
+if __name__ == "__main__":
+    main()
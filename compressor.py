@@ -0,0 +1,129 @@
+"""
+Token-budgeted extractive compression of article content before analysis
+"""
+import re
+from functools import lru_cache
+from typing import List, Optional
+from prefilter import KeywordPrefilter
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-based estimate
+    tiktoken = None
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def estimate_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Token count from tiktoken if installed, otherwise ~4 characters per token"""
+    if not text:
+        return 0
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+class ContentCompressor:
+    """
+    Picks the passages of an article worth sending to the LLM
+
+    Content is split into passages (scraped text has one line per text
+    node, so short lines are merged until they form a sentence-ending
+    passage). The first `lead_passages` are always kept, since news
+    leads carry the story; the remaining budget goes to the passages
+    densest in interest-area terms. Selected passages keep their
+    original order, with "[...]" marking gaps.
+    """
+
+    def __init__(
+        self,
+        matcher: KeywordPrefilter,
+        model: str = "gpt-4o-mini",
+        lead_passages: int = 2,
+        min_passage_chars: int = 200
+    ):
+        self.matcher = matcher
+        self.model = model
+        self.lead_passages = lead_passages
+        self.min_passage_chars = min_passage_chars
+
+    def _passages(self, content: str) -> List[str]:
+        passages = []
+        current = []
+        current_len = 0
+        for line in content.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            current.append(line)
+            current_len += len(line)
+            if current_len >= self.min_passage_chars and re.search(r'[.!?:"”)]$', line):
+                passages.append(" ".join(current))
+                current, current_len = [], 0
+        if current:
+            passages.append(" ".join(current))
+        return passages
+
+    def _truncate(self, text: str, token_budget: int) -> str:
+        """Cut a single passage down to roughly `token_budget` tokens at a word boundary"""
+        if tiktoken is not None:
+            encoding = _encoding(self.model)
+            tokens = encoding.encode(text, disallowed_special=())
+            if len(tokens) <= token_budget:
+                return text
+            text = encoding.decode(tokens[:token_budget])
+        else:
+            text = text[:token_budget * 4]
+        return text.rsplit(" ", 1)[0] if " " in text else text
+
+    def compress(self, content: str, token_budget: int) -> str:
+        """Content reduced to at most about `token_budget` tokens"""
+        if not content or estimate_tokens(content, self.model) <= token_budget:
+            return content or ""
+
+        passages = self._passages(content)
+        costs = [estimate_tokens(p, self.model) for p in passages]
+        selected: List[int] = []
+        remaining = token_budget
+
+        def take(index: int) -> bool:
+            nonlocal remaining
+            if costs[index] <= remaining:
+                selected.append(index)
+                remaining -= costs[index]
+                return True
+            return False
+
+        # Lead passages first; an oversized first passage is truncated rather than dropped
+        for index in range(min(self.lead_passages, len(passages))):
+            if not take(index) and index == 0:
+                return self._truncate(passages[0], token_budget)
+
+        # Then the passages with the most interest-area matches per token
+        density = {
+            i: self.matcher.count_matches(passages[i]) / max(1, costs[i])
+            for i in range(self.lead_passages, len(passages))
+        }
+        for index in sorted(density, key=lambda i: (-density[i], i)):
+            if density[index] <= 0 or remaining <= 0:
+                break
+            take(index)
+
+        # Fill any leftover budget in reading order
+        for index in range(len(passages)):
+            if remaining <= 0:
+                break
+            if index not in selected:
+                take(index)
+
+        parts = []
+        previous: Optional[int] = None
+        for index in sorted(selected):
+            if previous is not None and index != previous + 1:
+                parts.append("[...]")
+            parts.append(passages[index])
+            previous = index
+        return "\n".join(parts)
@@ -24,8 +24,30 @@ AREAS_OF_INTEREST = [
     "conflict analysis"
 ]
 
+# Extra terms for the local keyword pre-filter (whole words, any case; a trailing * matches any ending)
+AREA_SYNONYMS = {
+    "cybersecurity": ["cyber*", "security", "encryption", "cryptograph*", "backdoor", "exploit*", "botnet", "scam*", "fraud", "cyberattack", "cyber attack", "ransomware", "malware", "hacker", "hacking", "data breach", "vulnerability", "phishing", "zero-day", "APT"],
+    "threat intelligence": ["threat*", "threat actor", "indicators of compromise", "IOC", "threat report", "threat landscape"],
+    "disinformation": ["misinformation", "fake news", "propaganda", "false narrative", "fact-check", "deepfake", "conspiracy theory"],
+    "foreign interference": ["election interference", "foreign influence", "interference operation", "covert influence"],
+    "information warfare": ["info war", "information operation", "cognitive warfare", "psychological operation", "psyop"],
+    "national security": ["homeland security", "security policy", "national defence", "critical infrastructure"],
+    "intelligence": ["espionage", "spy", "spies", "intelligence agency", "counterintelligence", "CIA", "MI6", "GCHQ", "NSA", "surveillance"],
+    "defense": ["defence", "military", "militar*", "drone*", "missile*", "nuclear", "conscription", "army", "navy", "naval", "deterrence", "armed forces", "NATO", "Pentagon", "Ministry of Defence", "weapons"],
+    "strategic communications": ["stratcom", "public diplomacy", "counter-messaging", "narrative"],
+    "digital forensics": ["forensic analysis", "incident response", "OSINT", "open source intelligence"],
+    "hybrid threats": ["hybrid warfare", "grey zone", "gray zone", "sabotage"],
+    "influence operations": ["influence operation", "influence campaign", "coordinated inauthentic behavior", "coordinated inauthentic behaviour", "bot network", "troll farm"],
+    "data privacy": ["privacy", "personal data", "GDPR", "data protection", "surveillance", "biometric*", "online safety", "online harm*"],
+    "artificial intelligence security": ["AI security", "AI safety", "adversarial machine learning", "prompt injection", "generative AI", "genAI", "LLM*", "AI", "machine learning"],
+    "counter-terrorism": ["counterterrorism", "terrorism", "terrorist", "extremism", "extremist", "radicalisation", "radicalization", "jihadist"],
+    "international relations": ["diplomacy", "foreign policy", "geopolitic*", "sanctions", "bilateral", "alliance*", "allies", "great power*", "China", "Russia*", "Ukrain*", "Iran*"],
+    "conflict analysis": ["armed conflict", "ceasefire", "insurgency", "civil war", "conflict zone", "conflict*", "war", "warfare", "invasion", "violence", "fighters"],
+}
+
 # News sources configuration
 # Format: {"name": "Site Name", "url": "https://example.com", "is_rss": True/False, "selectors": {...}}
+# Optional per-host politeness: "rate_limit": {"requests_per_second": 0.5, "burst": 1}
 # Total: 232 sources
 NEWS_SOURCES = [
     {
@@ -1433,19 +1455,70 @@ COMMON_SELECTORS = {
 # Scraper settings
 SCRAPER_CONFIG = {
     "max_articles_per_site": 50,  # Limit articles per site per run
-    "request_delay": 1.0,  # Seconds between requests
+    "request_delay": 1.0,  # Default seconds between requests to the same host
+    "host_burst": 2,  # Requests a host may receive back-to-back before request_delay applies
+    "respect_crawl_delay": True,  # Slow down further for hosts whose robots.txt sets a Crawl-delay
     "timeout": 30,  # Request timeout in seconds
     "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "concurrent_sources": 10,  # Number of sources to scrape concurrently
-    "batch_delay": 5.0,  # Delay between batches of concurrent requests
+    "article_concurrency": 5,  # Article pages fetched at the same time within one HTML source
+    "max_connections_per_host": 4,  # Open connections allowed to any single host
+    "concurrent_sources": 10,  # Number of sources kept in flight (next starts as soon as one finishes)
     "max_sources": 20,  # Set to an integer to limit how many sources to process (None = all)
+    "parser_executor": "process",  # Where HTML/RSS parsing runs: "process" pool, "thread" pool or "inline"
+    "parser_workers": None,  # Parser pool size (None = number of CPUs)
+    "extraction_engine": "lxml",  # Article extraction: "lxml" (single pass, falls back to BeautifulSoup) or "bs4"
+    "http_cache_path": "http_cache.json",  # ETag/Last-Modified cache for conditional requests (None = disabled)
+    "http_cache_max_entries": 20000,  # Oldest validators are evicted beyond this many URLs
 }
 
 # Agent settings
 AGENT_CONFIG = {
     "model": "gpt-4o-mini",  # Use gpt-4o for better analysis, gpt-4o-mini for cost efficiency
     "relevance_threshold": 0.5,  # Minimum relevance score to consider article relevant
-    "max_content_length": 5000,  # Maximum characters to send to agent for analysis
+    "max_content_length": 20000,  # Characters of each article considered before compression
+    "max_content_tokens": 1000,  # Token budget for an article's content in its own request (None = send max_content_length characters)
+    "lead_passages": 2,  # Opening passages always kept when compressing content
+    "max_concurrency": 8,  # Articles analyzed at the same time (halved on rate-limit errors, then regrown)
+    "requests_per_minute": 500,  # Request budget; set to your OpenAI tier's RPM limit
+    "tokens_per_minute": 200000,  # Token budget; set to your OpenAI tier's TPM limit
+    "expected_output_tokens": 150,  # Reply size assumed when estimating a request's tokens
+    "max_retries": 5,  # Retries per article after rate-limit errors
+    "backoff_base": 2.0,  # Seconds to pause after the first rate-limit error (doubles per retry)
+    "packed_batch_tokens": 6000,  # Pack several articles into one request up to this many input tokens (None = one per request)
+    "packed_max_articles": 10,  # Most articles packed into a single request
+    "packed_content_tokens": 400,  # Token budget for each article's content in a packed request
+    "prefilter_min_score": 0.15,  # Articles scoring below this locally skip the LLM (None = send everything)
+    "prefilter_audit_rate": 0.05,  # Share of below-floor articles still sent to the LLM to measure misses
+    "analysis_cache_path": "analysis_cache.db",  # Reuse analyses of identical content (None = disabled)
+    "analysis_cache_max_entries": 50000,  # Least recently used analyses are evicted beyond this
+}
+
+# Database settings
+DATABASE_CONFIG = {
+    "path": "news_articles.db",
+    "journal_mode": "WAL",  # WAL lets viewers read while a scrape is writing
+    "synchronous": "NORMAL",  # NORMAL is safe with WAL; FULL fsyncs every commit
+    "cache_size": -64000,  # Page cache per connection (negative = KiB, so ~64 MB)
+    "mmap_size": 268435456,  # Bytes of the database file to memory-map (0 = disabled)
+    "busy_timeout_ms": 5000,  # How long to wait for a lock held by another process
+    "reader_connections": 2,  # Pooled read-only connections alongside the single writer
 }
 
+# Near-duplicate detection settings
+DEDUP_CONFIG = {
+    "enabled": True,  # Analyze one article per cluster of near-identical stories
+    "max_distance": 3,  # Most differing SimHash bits (of 64) for two articles to count as the same story
+    "shingle_size": 3,  # Words per shingle when fingerprinting content
+    "min_words": 50,  # Shorter content is not fingerprinted (too little text to compare)
+    "lookback_days": 7,  # Also match against articles stored this recently
+    "store_duplicate_content": False,  # Keep content for duplicates (False = only the first report keeps it)
+}
 
+# Pipeline settings (stages run concurrently, connected by bounded queues)
+PIPELINE_CONFIG = {
+    "queue_size": 8,  # Batches waiting between stages before the earlier stage pauses
+    "analysis_workers": 8,  # Batches analyzed at once (requests still share AGENT_CONFIG's limits)
+    "analysis_batch_size": 40,  # Most articles per analysis batch
+    "claim_batch_size": 100,  # Unprocessed articles claimed at a time by `python main.py analyze`
+    "claim_timeout_minutes": 30,  # Claims older than this are assumed abandoned (crashed worker) and retried
+}
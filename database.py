@@ -3,24 +3,225 @@ Database operations for storing scraped articles
 """
 import aiosqlite
 import asyncio
-from datetime import datetime
-from typing import List, Dict, Optional
-import hashlib
+import re
+import sqlite3
+import zlib
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Dict, Optional, Set, Tuple
+from config import DATABASE_CONFIG
+from near_duplicates import article_hash
+
+def compress_content(content: Optional[str]) -> Optional[bytes]:
+    """zlib-compressed UTF-8 article text, as stored in article_contents"""
+    if content is None:
+        return None
+    return zlib.compress(content.encode("utf-8"), 6)
+
+def decompress_content(data: Optional[bytes]) -> Optional[str]:
+    """Inverse of compress_content"""
+    if data is None:
+        return None
+    return zlib.decompress(data).decode("utf-8")
+
+def _stem(word: str) -> str:
+    """Rough stand-in for the index's porter stemmer, enough to highlight word forms"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+def _query_terms(query: str) -> List[Tuple[str, bool]]:
+    """(stem or prefix, is_prefix) for each word of an FTS5 query, skipping operators and column names"""
+    terms = []
+    for word, prefix, column in re.findall(r"(\w+)(\*?)(:?)", query):
+        if column or word in ("AND", "OR", "NOT", "NEAR"):
+            continue
+        terms.append((word.lower(), True) if prefix else (_stem(word.lower()), False))
+    return terms
+
+def _snippet(texts: List[Optional[str]], terms: List[Tuple[str, bool]], size: int = 16) -> Optional[str]:
+    """
+    The `size` words of `texts` with the most query terms, hits in [brackets]
+    
+    Like FTS5's snippet(), which needs the indexed text and so isn't
+    available on a contentless index.
+    """
+    def is_hit(word: str) -> bool:
+        word = re.sub(r"\W+", "", word).lower()
+        return bool(word) and any(
+            word.startswith(term) if prefix else _stem(word) == term for term, prefix in terms
+        )
+    
+    best = None
+    for text in texts:
+        words = (text or "").split()
+        if not words:
+            continue
+        hits = [is_hit(word) for word in words]
+        # Sliding window with the most hits, earliest first
+        count = sum(hits[:size])
+        best_count, best_start = count, 0
+        for start in range(1, max(1, len(words) - size + 1)):
+            count += hits[start + size - 1] - hits[start - 1]
+            if count > best_count:
+                best_count, best_start = count, start
+        if best is None or best_count > best[0]:
+            best = (best_count, words, hits, best_start)
+    if best is None:
+        return None
+    
+    _, words, hits, start = best
+    end = min(len(words), start + size)
+    shown = [f"[{word}]" if hit else word for word, hit in zip(words[start:end], hits[start:end])]
+    return ("..." if start > 0 else "") + " ".join(shown) + ("..." if end < len(words) else "")
 
 class NewsDatabase:
-    def __init__(self, db_path: str = "news_articles.db"):
-        self.db_path = db_path
+    """
+    Article store backed by long-lived SQLite connections
+    
+    One writer connection serialises all writes; a small pool of reader
+    connections serves queries. In WAL mode readers (including other
+    processes such as view_articles.py) never block on the writer. The
+    pool is kept open inside `async with NewsDatabase() as db:`; used
+    without it, each call opens and closes its own connection, so none
+    is left running when the event loop ends.
+    """
+    
+    # Score at which get_statistics counts an article as relevant
+    RELEVANT_THRESHOLD = 0.5
+    
+    # What article listings return; the text itself is fetched with get_article_content
+    LISTING_COLUMNS = (
+        "id, url, title, source, published_date, scraped_date, "
+        "relevance_score, areas_of_interest, summary, cluster_id"
+    )
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.config = DATABASE_CONFIG
+        self.db_path = db_path or self.config.get("path", "news_articles.db")
         self._initialized = False
+        self._init_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._readers: Optional[asyncio.Queue] = None
+        self._reader_conns: List[aiosqlite.Connection] = []
+        self._pooled = False  # Inside async with
+        self._fts_available = False
+        self._fts_contentless_delete = False
+    
+    async def __aenter__(self):
+        self._pooled = True
+        await self.initialize()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        self._pooled = False
+    
+    async def _pragma(self, conn: aiosqlite.Connection, pragma: str):
+        """Run a PRAGMA and finalize it (an open statement would hold a lock)"""
+        async with conn.execute(f"PRAGMA {pragma}") as cursor:
+            await cursor.fetchall()
+    
+    async def _open_connection(self) -> aiosqlite.Connection:
+        """Open a connection with the configured pragmas applied"""
+        conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        await self._pragma(conn, f"busy_timeout = {int(self.config.get('busy_timeout_ms', 5000))}")
+        await self._pragma(conn, f"synchronous = {self.config.get('synchronous', 'NORMAL')}")
+        await self._pragma(conn, f"cache_size = {int(self.config.get('cache_size', -64000))}")
+        await self._pragma(conn, f"mmap_size = {int(self.config.get('mmap_size', 0))}")
+        await self._pragma(conn, "temp_store = MEMORY")
+        return conn
+    
+    async def _connect(self):
+        """Open the writer and reader connections"""
+        self._writer = await self._open_connection()
+        # journal_mode is persistent, so only the writer needs to set it
+        await self._pragma(self._writer, f"journal_mode = {self.config.get('journal_mode', 'WAL')}")
+        if not self._pooled and self.db_path != ":memory:":
+            # Only needed for that; calls open their own connections
+            await self._writer.close()
+            self._writer = None
+            return
+        
+        self._readers = asyncio.Queue()
+        if self.db_path == ":memory:":
+            # Each connection would see its own empty in-memory database
+            self._readers.put_nowait(self._writer)
+            return
+        for _ in range(max(1, self.config.get("reader_connections", 2))):
+            conn = await self._open_connection()
+            self._reader_conns.append(conn)
+            self._readers.put_nowait(conn)
+    
+    async def close(self):
+        """Close all pooled connections (if any)"""
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns = []
+        self._readers = None
+        if self._writer:
+            await self._writer.close()
+            self._writer = None
+        self._initialized = False
+    
+    @asynccontextmanager
+    async def _read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a reader connection from the pool, or open one for this call"""
+        if self._readers is None:
+            conn = await self._open_connection()
+            try:
+                yield conn
+            finally:
+                await conn.close()
+            return
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+    
+    @asynccontextmanager
+    async def _write(self, immediate: bool = False) -> AsyncIterator[aiosqlite.Connection]:
+        """Run a transaction on the writer connection (or one opened for this call), committing on success"""
+        async with self._write_lock:
+            conn = self._writer or await self._open_connection()
+            try:
+                if immediate:
+                    await conn.execute("BEGIN IMMEDIATE")
+                yield conn
+                await conn.commit()
+            except BaseException:
+                await conn.rollback()
+                raise
+            finally:
+                if conn is not self._writer:
+                    await conn.close()
     
     async def initialize(self):
-        """Initialize database tables"""
-        async with aiosqlite.connect(self.db_path) as db:
+        """Open connections and initialize database tables"""
+        async with self._init_lock:
+            if self._initialized:
+                return
+            try:
+                await self._connect()
+                await self._create_schema()
+            except BaseException:
+                # Connection threads are not daemonic, don't leave them running
+                await self.close()
+                raise
+            self._initialized = True
+    
+    async def _create_schema(self):
+        """Create tables and indexes"""
+        async with self._write() as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS articles (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     url TEXT UNIQUE NOT NULL,
                     title TEXT NOT NULL,
-                    content TEXT,
                     source TEXT NOT NULL,
                     published_date TEXT,
                     scraped_date TEXT NOT NULL,
@@ -28,10 +229,23 @@ class NewsDatabase:
                     areas_of_interest TEXT,
                     summary TEXT,
                     hash TEXT UNIQUE NOT NULL,
-                    processed BOOLEAN DEFAULT 0
+                    processed BOOLEAN DEFAULT 0,
+                    simhash INTEGER,
+                    cluster_id TEXT,
+                    claimed_at TEXT
                 )
             """)
             
+            # Columns added after the first release
+            async with db.execute("PRAGMA table_info(articles)") as cursor:
+                columns = {row[1] for row in await cursor.fetchall()}
+            for column, column_type in (("simhash", "INTEGER"), ("cluster_id", "TEXT"), ("claimed_at", "TEXT")):
+                if column not in columns:
+                    await db.execute(f"ALTER TABLE articles ADD COLUMN {column} {column_type}")
+            if "claimed_at" not in columns:
+                # Before `processed` was used, every stored article had been analyzed
+                await db.execute("UPDATE articles SET processed = 1 WHERE relevance_score IS NOT NULL")
+            
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS scraping_log (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -44,6 +258,10 @@ class NewsDatabase:
                 )
             """)
             
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_run_date ON scraping_log(run_date)
+            """)
+            
             await db.execute("""
                 CREATE INDEX IF NOT EXISTS idx_url ON articles(url)
             """)
@@ -52,36 +270,400 @@ class NewsDatabase:
                 CREATE INDEX IF NOT EXISTS idx_hash ON articles(hash)
             """)
             
+            # Listings walk these in ORDER BY order and stop at LIMIT, testing
+            # relevance_score in the index instead of sorting matches in a temp B-tree
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_relevance ON articles(scraped_date, relevance_score)
+            """)
+            
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_source_scraped_relevance
+                ON articles(source, scraped_date, relevance_score)
+            """)
+            
+            # Keyset pagination and archive walks in (scraped_date, id) order;
+            # SQLite appends the rowid (id) to every index entry
             await db.execute("""
                 CREATE INDEX IF NOT EXISTS idx_scraped_date ON articles(scraped_date)
             """)
             
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_source_scraped ON articles(source, scraped_date)
+            """)
+            
             await db.execute("""
                 CREATE INDEX IF NOT EXISTS idx_relevance_score ON articles(relevance_score)
             """)
             
-            await db.commit()
-        self._initialized = True
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cluster_id ON articles(cluster_id)
+            """)
+            
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_pending ON articles(processed, claimed_at)
+            """)
+            
+            await self._create_content_store(db, "content" in columns)
+            await self._create_counters(db)
+            await self._create_area_index(db)
+            await self._create_search_index(db)
+    
+    async def _table_exists(self, db, name: str) -> bool:
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (name,)
+        ) as cursor:
+            return await cursor.fetchone() is not None
+    
+    async def _create_content_store(self, db, migrate_inline_content: bool):
+        """
+        Article text lives compressed in its own table, one row per article
+        
+        Keeping it out of `articles` keeps that table's rows (and pages)
+        small for listings and scans. Text is compressed and decompressed
+        in Python, so plain SQLite clients can still read and write the
+        database (they just see the text as zlib blobs).
+        """
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS article_contents (
+                article_id INTEGER PRIMARY KEY REFERENCES articles(id),
+                content BLOB
+            )
+        """)
+        
+        if migrate_inline_content:
+            # Databases from before the split keep content in articles.content;
+            # the old search triggers reference it and must go before the column can
+            for trigger in ("articles_fts_insert", "articles_fts_delete", "articles_fts_update"):
+                await db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            async with db.execute("SELECT id, content FROM articles WHERE content IS NOT NULL") as cursor:
+                rows = await cursor.fetchall()
+            await db.executemany(
+                "INSERT OR IGNORE INTO article_contents (article_id, content) VALUES (?, ?)",
+                [(row[0], compress_content(row[1])) for row in rows]
+            )
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                await db.execute("ALTER TABLE articles DROP COLUMN content")
+            else:
+                # No DROP COLUMN before SQLite 3.35; empty the column and rename
+                # it (3.25+) so this migration doesn't run again on every open
+                print(f"SQLite {sqlite3.sqlite_version} can't drop articles.content (needs 3.35+), clearing it instead")
+                await db.execute("UPDATE articles SET content = NULL WHERE content IS NOT NULL")
+                await db.execute("ALTER TABLE articles RENAME COLUMN content TO content_moved")
+        
+        # Foreign keys aren't enforced, so clean up deleted articles here
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS article_contents_delete AFTER DELETE ON articles BEGIN
+                DELETE FROM article_contents WHERE article_id = old.id;
+            END
+        """)
+    
+    async def _create_counters(self, db):
+        """Per-source article counts for get_statistics, kept current by triggers"""
+        exists = await self._table_exists(db, "article_counts")
+        
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS article_counts (
+                source TEXT PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0,
+                relevant INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        
+        # Triggers run inside the statement that changes `articles`, so the
+        # counts commit or roll back together with the articles themselves
+        relevant_new = f"COALESCE(new.relevance_score >= {self.RELEVANT_THRESHOLD}, 0)"
+        relevant_old = f"COALESCE(old.relevance_score >= {self.RELEVANT_THRESHOLD}, 0)"
+        add_new = f"""
+            INSERT INTO article_counts (source, total, relevant) VALUES (new.source, 1, {relevant_new})
+            ON CONFLICT(source) DO UPDATE SET total = total + 1, relevant = relevant + excluded.relevant;
+        """
+        remove_old = f"""
+            UPDATE article_counts SET total = total - 1, relevant = relevant - {relevant_old}
+            WHERE source = old.source;
+        """
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS article_counts_insert AFTER INSERT ON articles BEGIN
+                {add_new}
+            END
+        """)
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS article_counts_delete AFTER DELETE ON articles BEGIN
+                {remove_old}
+            END
+        """)
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS article_counts_update AFTER UPDATE OF source, relevance_score ON articles BEGIN
+                {remove_old}
+                {add_new}
+            END
+        """)
+        
+        if not exists:
+            await self._rebuild_counters(db)
+    
+    async def _rebuild_counters(self, db):
+        """Recount article_counts from the articles table"""
+        await db.execute("DELETE FROM article_counts")
+        await db.execute(f"""
+            INSERT INTO article_counts (source, total, relevant)
+            SELECT source, COUNT(*), COALESCE(SUM(relevance_score >= {self.RELEVANT_THRESHOLD}), 0)
+            FROM articles
+            GROUP BY source
+        """)
+    
+    async def rebuild_statistics(self):
+        """Recompute the counters behind get_statistics with a full scan (e.g. after editing the file by hand)"""
+        if not self._initialized:
+            await self.initialize()
+        
+        async with self._write(immediate=True) as db:
+            await self._rebuild_counters(db)
+    
+    async def _create_area_index(self, db):
+        """One row per (article, area of interest), for per-area index lookups"""
+        exists = await self._table_exists(db, "article_areas")
+        
+        # Keyed by area first, so an area's articles are one range scan in id (= scrape) order
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS article_areas (
+                area TEXT NOT NULL,
+                article_id INTEGER NOT NULL REFERENCES articles(id),
+                PRIMARY KEY (area, article_id)
+            ) WITHOUT ROWID
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_article_areas_article ON article_areas(article_id)
+        """)
+        # Foreign keys aren't enforced, so clean up deleted articles here
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS article_areas_delete AFTER DELETE ON articles BEGIN
+                DELETE FROM article_areas WHERE article_id = old.id;
+            END
+        """)
+        
+        if not exists:
+            # Split the areas of articles stored before the table existed
+            async with db.execute(
+                "SELECT id, areas_of_interest FROM articles WHERE areas_of_interest IS NOT NULL"
+            ) as cursor:
+                rows = await cursor.fetchall()
+            await db.executemany(
+                "INSERT OR IGNORE INTO article_areas (area, article_id) VALUES (?, ?)",
+                [(area, row[0]) for row in rows for area in self._normalize_areas(row[1].split(","))]
+            )
+    
+    @staticmethod
+    def _normalize_areas(areas) -> List[str]:
+        """Lower-cased, stripped, de-duplicated area names"""
+        return list(dict.fromkeys(area.strip().lower() for area in areas or [] if area and area.strip()))
+    
+    async def _create_search_index(self, db):
+        """
+        Full-text index over title, summary and content
+        
+        The index is contentless: it stores only the token index, not a
+        second copy of the text, so snippets are cut from the decompressed
+        text in Python. save_articles indexes new articles and save_analyses
+        re-indexes them when their summary changes. Deleted articles are
+        dropped by a plain-SQL trigger from SQLite 3.43, and queued for
+        _purge_deleted_from_index on older versions.
+        """
+        async with db.execute("SELECT sql FROM sqlite_master WHERE name = 'articles_fts'") as cursor:
+            row = await cursor.fetchone()
+        exists = row is not None
+        if exists and "content=''" not in row[0].replace(" ", ""):
+            # Earlier versions kept (or read) a copy of the text; replace that
+            # index and its triggers
+            for trigger in ("articles_fts_insert", "articles_fts_delete", "articles_fts_update",
+                            "articles_fts_content_update"):
+                await db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            await db.execute("DROP VIEW IF EXISTS articles_text")
+            await db.execute("DROP TABLE articles_fts")
+            exists = False
+        if not exists:
+            await db.execute("DROP TABLE IF EXISTS articles_fts_deleted")
+        
+        # Deleting by rowid from a contentless table needs contentless_delete (3.43+)
+        contentless_delete = sqlite3.sqlite_version_info >= (3, 43, 0)
+        try:
+            await db.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                    title, summary, content,
+                    content='', {"contentless_delete=1, " if contentless_delete else ""}
+                    tokenize='porter unicode61'
+                )
+            """)
+        except aiosqlite.OperationalError as e:
+            print(f"Full-text search unavailable (SQLite built without FTS5?): {str(e)}")
+            self._fts_available = False
+            return
+        self._fts_available = True
+        
+        async with db.execute("SELECT sql FROM sqlite_master WHERE name = 'articles_fts'") as cursor:
+            self._fts_contentless_delete = "contentless_delete=1" in (await cursor.fetchone())[0].replace(" ", "")
+        if self._fts_contentless_delete:
+            await db.execute("""
+                CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                    DELETE FROM articles_fts WHERE rowid = old.id;
+                END
+            """)
+        else:
+            # Otherwise an index row can only be removed with the values it was
+            # indexed with, so a deletion queues them for _purge_deleted_from_index
+            # (BEFORE, while article_contents still has the text)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS articles_fts_deleted (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT,
+                    summary TEXT,
+                    content BLOB
+                )
+            """)
+            await db.execute("""
+                CREATE TRIGGER IF NOT EXISTS articles_fts_delete BEFORE DELETE ON articles BEGIN
+                    INSERT OR REPLACE INTO articles_fts_deleted (id, title, summary, content)
+                    SELECT old.id, old.title, old.summary,
+                           (SELECT content FROM article_contents WHERE article_id = old.id);
+                END
+            """)
+        
+        if not exists:
+            # Index articles stored before the search index existed
+            async with db.execute("""
+                SELECT a.id, a.title, a.summary, c.content
+                FROM articles a
+                LEFT JOIN article_contents c ON c.article_id = a.id
+            """) as cursor:
+                rows = await cursor.fetchall()
+            await db.executemany(
+                "INSERT INTO articles_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+                [(row[0], row[1], row[2], decompress_content(row[3])) for row in rows]
+            )
+        await self._purge_deleted_from_index(db)
+    
+    async def _purge_deleted_from_index(self, db):
+        """
+        Remove queued deleted articles from the search index
+        
+        Runs before new articles are indexed, since SQLite may give a new
+        article the id of a deleted one.
+        """
+        if self._fts_contentless_delete:
+            return
+        async with db.execute("SELECT id, title, summary, content FROM articles_fts_deleted") as cursor:
+            rows = await cursor.fetchall()
+        if not rows:
+            return
+        await db.executemany(
+            "INSERT INTO articles_fts (articles_fts, rowid, title, summary, content) VALUES ('delete', ?, ?, ?, ?)",
+            [(row[0], row[1], row[2], decompress_content(row[3])) for row in rows]
+        )
+        await db.executemany("DELETE FROM articles_fts_deleted WHERE id = ?", [(row[0],) for row in rows])
+    
+    async def _reindex_summaries(self, db, summaries: Dict[int, Optional[str]]):
+        """
+        Re-index articles whose summary is about to change (call before the UPDATE)
+        
+        A contentless index row can't be edited, only replaced: without
+        contentless_delete, removing it takes the exact values it was
+        indexed with, which are still in articles at this point.
+        """
+        ids = list(summaries)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            async with db.execute(f"""
+                SELECT a.id, a.title, a.summary, c.content
+                FROM articles a
+                LEFT JOIN article_contents c ON c.article_id = a.id
+                WHERE a.id IN ({placeholders})
+            """, chunk) as cursor:
+                rows = [row for row in await cursor.fetchall() if row[2] != summaries[row[0]]]
+            if not rows:
+                continue
+            contents = {row[0]: decompress_content(row[3]) for row in rows}
+            if self._fts_contentless_delete:
+                await db.executemany("DELETE FROM articles_fts WHERE rowid = ?", [(row[0],) for row in rows])
+            else:
+                await db.executemany(
+                    "INSERT INTO articles_fts (articles_fts, rowid, title, summary, content) VALUES ('delete', ?, ?, ?, ?)",
+                    [(row[0], row[1], row[2], contents[row[0]]) for row in rows]
+                )
+            await db.executemany(
+                "INSERT INTO articles_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+                [(row[0], row[1], summaries[row[0]], contents[row[0]]) for row in rows]
+            )
     
     def _generate_hash(self, url: str, title: str) -> str:
         """Generate hash for deduplication"""
-        content = f"{url}{title}".encode('utf-8')
-        return hashlib.md5(content).hexdigest()
+        return article_hash(url, title)
     
     async def article_exists(self, url: str, title: str) -> bool:
         """Check if article already exists"""
         if not self._initialized:
             await self.initialize()
         
-        article_hash = self._generate_hash(url, title)
-        async with aiosqlite.connect(self.db_path) as db:
+        row_hash = self._generate_hash(url, title)
+        async with self._read() as db:
             async with db.execute(
                 "SELECT 1 FROM articles WHERE hash = ? OR url = ?",
-                (article_hash, url)
+                (row_hash, url)
             ) as cursor:
                 row = await cursor.fetchone()
                 return row is not None
     
+    async def _existing_values(self, db, column: str, values: List[str]) -> Set[str]:
+        """Return which of `values` are present in an indexed articles column"""
+        existing = set()
+        unique_values = list(dict.fromkeys(values))
+        # Chunk to stay under SQLite's bound-parameter limit
+        for i in range(0, len(unique_values), 500):
+            chunk = unique_values[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            async with db.execute(
+                f"SELECT {column} FROM articles WHERE {column} IN ({placeholders})", chunk
+            ) as cursor:
+                existing.update(row[0] for row in await cursor.fetchall())
+        return existing
+    
+    async def get_existing_urls(self, urls: List[str]) -> Set[str]:
+        """Return the subset of `urls` already stored"""
+        if not self._initialized:
+            await self.initialize()
+        
+        async with self._read() as db:
+            return await self._existing_values(db, "url", urls)
+    
+    async def filter_new(self, articles: List[Dict]) -> List[Dict]:
+        """
+        Return only the articles not already stored, in their original order
+        
+        Checks the whole batch with a few set-based queries instead of one
+        article_exists call per article. Duplicates within the batch are
+        also dropped, keeping the first occurrence.
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        if not articles:
+            return []
+        
+        hashes = [self._generate_hash(a["url"], a["title"]) for a in articles]
+        async with self._read() as db:
+            # Separate lookups so each one can use its own unique index
+            known_hashes = await self._existing_values(db, "hash", hashes)
+            known_urls = await self._existing_values(db, "url", [a["url"] for a in articles])
+        
+        new_articles = []
+        for article, row_hash in zip(articles, hashes):
+            if row_hash in known_hashes or article["url"] in known_urls:
+                continue
+            # Remember this one so later copies in the batch are skipped
+            known_hashes.add(row_hash)
+            known_urls.add(article["url"])
+            new_articles.append(article)
+        return new_articles
+    
     async def save_article(
         self,
         url: str,
@@ -94,31 +676,285 @@ class NewsDatabase:
         summary: Optional[str] = None
     ) -> bool:
         """Save article if it doesn't exist"""
+        saved = await self.save_articles([{
+            "url": url,
+            "title": title,
+            "content": content,
+            "source": source,
+            "date": published_date,
+            "relevance_score": relevance_score,
+            "areas_of_interest": areas_of_interest,
+            "summary": summary
+        }])
+        return saved[0]
+    
+    async def save_articles(self, articles: List[Dict]) -> List[bool]:
+        """
+        Save a batch of articles in a single transaction
+        
+        Articles are dicts as produced by the scraper and analyzer (url,
+        title, content, source, date, relevance_score, areas_of_interest,
+        summary, and optionally simhash and cluster_id). Articles without
+        a relevance_score, or whose analysis failed, are stored as
+        unprocessed for `python main.py analyze` to pick up. Returns one
+        flag per article, True if it was inserted and False if it already
+        existed (by hash or URL), repeated an earlier article in the
+        batch, or lacked a url/title/source.
+        """
         if not self._initialized:
             await self.initialize()
         
-        if await self.article_exists(url, title):
-            return False
+        outcomes = [False] * len(articles)
+        if not articles:
+            return outcomes
         
-        article_hash = self._generate_hash(url, title)
         scraped_date = datetime.now().isoformat()
-        areas_str = ",".join(areas_of_interest) if areas_of_interest else None
+        hashes = [
+            self._generate_hash(a["url"], a["title"]) if a.get("url") and a.get("title") else None
+            for a in articles
+        ]
         
-        async with aiosqlite.connect(self.db_path) as db:
-            try:
-                await db.execute("""
-                    INSERT INTO articles 
-                    (url, title, content, source, published_date, scraped_date, 
-                     relevance_score, areas_of_interest, summary, hash)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    url, title, content, source, published_date, scraped_date,
-                    relevance_score, areas_str, summary, article_hash
+        # IMMEDIATE takes the write lock up front, so nothing can be inserted
+        # by another process between the existence check and the insert
+        async with self._write(immediate=True) as db:
+            known_hashes = await self._existing_values(db, "hash", [h for h in hashes if h])
+            known_urls = await self._existing_values(db, "url", [a["url"] for a in articles if a.get("url")])
+            
+            rows = []
+            row_areas = []
+            row_contents = []
+            for i, (article, row_hash) in enumerate(zip(articles, hashes)):
+                if not row_hash or not article.get("source"):
+                    continue
+                if row_hash in known_hashes or article["url"] in known_urls:
+                    continue
+                known_hashes.add(row_hash)
+                known_urls.add(article["url"])
+                
+                areas = article.get("areas_of_interest")
+                rows.append((
+                    article["url"], article["title"], article["source"],
+                    article.get("date"), scraped_date, article.get("relevance_score"),
+                    ",".join(areas) if areas else None, article.get("summary"), row_hash,
+                    article.get("simhash"), article.get("cluster_id"), self._is_processed(article)
                 ))
-                await db.commit()
-                return True
-            except aiosqlite.IntegrityError:
-                return False
+                row_areas.append(areas)
+                row_contents.append(article.get("content", ""))
+                outcomes[i] = True
+            
+            await db.executemany("""
+                INSERT OR IGNORE INTO articles 
+                (url, title, source, published_date, scraped_date, 
+                 relevance_score, areas_of_interest, summary, hash, simhash, cluster_id, processed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            # Rows are found by hash, since executemany doesn't return their ids
+            await db.executemany(
+                "INSERT OR IGNORE INTO article_contents (article_id, content) SELECT id, ? FROM articles WHERE hash = ?",
+                [(compress_content(content), row[8]) for row, content in zip(rows, row_contents)]
+            )
+            if self._fts_available:
+                await self._purge_deleted_from_index(db)
+                await db.executemany("""
+                    INSERT INTO articles_fts (rowid, title, summary, content)
+                    SELECT id, title, summary, ? FROM articles WHERE hash = ?
+                """, [(content, row[8]) for row, content in zip(rows, row_contents)])
+            await self._tag_cluster_roots(db, [row[10] for row in rows])
+            await db.executemany(
+                "INSERT OR IGNORE INTO article_areas (area, article_id) SELECT ?, id FROM articles WHERE hash = ?",
+                [
+                    (area, row[8])
+                    for row, areas in zip(rows, row_areas)
+                    for area in self._normalize_areas(areas)
+                ]
+            )
+        
+        return outcomes
+    
+    @staticmethod
+    def _is_processed(article: Dict) -> int:
+        """Whether an article carries a usable analysis (stored in `processed`)"""
+        return int(article.get("relevance_score") is not None and not article.get("analysis_error"))
+    
+    async def _tag_cluster_roots(self, db, cluster_ids: List[Optional[str]]):
+        """A cluster can start at an article stored before clustering existed"""
+        cluster_ids = list({cluster_id for cluster_id in cluster_ids if cluster_id})
+        for i in range(0, len(cluster_ids), 500):
+            chunk = cluster_ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            await db.execute(
+                f"UPDATE articles SET cluster_id = hash WHERE cluster_id IS NULL AND hash IN ({placeholders})",
+                chunk
+            )
+    
+    async def claim_pending(self, limit: int = 100, stale_after_minutes: float = 30) -> List[Dict]:
+        """
+        Claim up to `limit` unprocessed articles for analysis, oldest first
+        
+        Claimed rows are skipped by other analyze workers until they are
+        completed with save_analyses. A claim older than
+        `stale_after_minutes` is assumed to belong to a crashed worker and
+        is handed out again.
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        now = datetime.now()
+        stale_before = (now - timedelta(minutes=stale_after_minutes)).isoformat()
+        async with self._write(immediate=True) as db:
+            async with db.execute("""
+                SELECT id, url, title, source, published_date AS date, simhash, cluster_id
+                FROM articles
+                WHERE processed = 0 AND (claimed_at IS NULL OR claimed_at < ?)
+                ORDER BY id
+                LIMIT ?
+            """, (stale_before, limit)) as cursor:
+                rows = [dict(row) for row in await cursor.fetchall()]
+            contents = await self._fetch_contents(db, [row["id"] for row in rows])
+            for row in rows:
+                row["content"] = contents.get(row["id"])
+            await db.executemany(
+                "UPDATE articles SET claimed_at = ? WHERE id = ?",
+                [(now.isoformat(), row["id"]) for row in rows]
+            )
+        return rows
+    
+    async def save_analyses(self, articles: List[Dict]) -> int:
+        """
+        Store analyses of claimed articles (dicts with "id") and mark them processed
+        
+        Articles whose analysis failed keep their claim, so they are retried
+        once it goes stale. Returns the number of articles completed.
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        rows = []
+        for article in articles:
+            if not self._is_processed(article):
+                continue
+            areas = article.get("areas_of_interest")
+            rows.append((
+                article["relevance_score"], ",".join(areas) if areas else None, article.get("summary"),
+                article.get("simhash"), article.get("cluster_id"), article["id"]
+            ))
+        
+        async with self._write(immediate=True) as db:
+            if self._fts_available:
+                await self._reindex_summaries(db, {row[5]: row[2] for row in rows})
+            await db.executemany("""
+                UPDATE articles
+                SET relevance_score = ?, areas_of_interest = ?, summary = ?,
+                    simhash = ?, cluster_id = ?, processed = 1, claimed_at = NULL
+                WHERE id = ?
+            """, rows)
+            await self._tag_cluster_roots(db, [row[4] for row in rows])
+            await self._replace_areas(db, {
+                article["id"]: article.get("areas_of_interest") for article in articles if self._is_processed(article)
+            })
+        return len(rows)
+    
+    async def _replace_areas(self, db, areas_by_id: Dict[int, Optional[List[str]]]):
+        """Set the article_areas rows of existing articles"""
+        await db.executemany("DELETE FROM article_areas WHERE article_id = ?", [(i,) for i in areas_by_id])
+        await db.executemany(
+            "INSERT OR IGNORE INTO article_areas (area, article_id) VALUES (?, ?)",
+            [(area, i) for i, areas in areas_by_id.items() for area in self._normalize_areas(areas)]
+        )
+    
+    async def count_pending(self) -> int:
+        """Number of articles waiting for analysis"""
+        if not self._initialized:
+            await self.initialize()
+        
+        async with self._read() as db:
+            async with db.execute("SELECT COUNT(*) FROM articles WHERE processed = 0") as cursor:
+                return (await cursor.fetchone())[0]
+    
+    async def get_dedup_candidates(self, days: int = 7) -> List[Dict]:
+        """
+        Recently scraped, analyzed articles to match new ones against
+        
+        Content is only returned for rows stored without a fingerprint,
+        so the caller can compute one.
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        async with self._read() as db:
+            async with db.execute("""
+                SELECT id, hash, source, simhash, cluster_id, relevance_score, areas_of_interest, summary
+                FROM articles
+                WHERE scraped_date >= ? AND processed = 1
+                ORDER BY scraped_date
+            """, (since,)) as cursor:
+                rows = [dict(row) for row in await cursor.fetchall()]
+            contents = await self._fetch_contents(db, [row["id"] for row in rows if row["simhash"] is None])
+        for row in rows:
+            row["content"] = contents.get(row.pop("id"))
+        return rows
+    
+    async def _fetch_contents(self, db, article_ids: List[int]) -> Dict[int, Optional[str]]:
+        """Decompressed content by article id"""
+        contents = {}
+        for i in range(0, len(article_ids), 500):
+            chunk = article_ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            async with db.execute(
+                f"SELECT article_id, content FROM article_contents WHERE article_id IN ({placeholders})", chunk
+            ) as cursor:
+                for row in await cursor.fetchall():
+                    contents[row[0]] = decompress_content(row[1])
+        return contents
+    
+    async def get_article_content(self, article_id: int) -> Optional[str]:
+        """Full text of one article (listings leave it out)"""
+        contents = await self.get_article_contents([article_id])
+        return contents.get(article_id)
+    
+    async def get_article_contents(self, article_ids: List[int]) -> Dict[int, Optional[str]]:
+        """Full text of several articles, by id"""
+        if not self._initialized:
+            await self.initialize()
+        
+        async with self._read() as db:
+            return await self._fetch_contents(db, list(dict.fromkeys(article_ids)))
+    
+    async def get_cluster_analyses(self, cluster_ids: List[str]) -> Dict[str, Dict]:
+        """The analysis of the first processed article of each cluster, by cluster id"""
+        if not self._initialized:
+            await self.initialize()
+        
+        analyses = {}
+        unique_ids = list(dict.fromkeys(cluster_ids))
+        async with self._read() as db:
+            for i in range(0, len(unique_ids), 500):
+                chunk = unique_ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                # With MIN(), SQLite takes the other columns from the row with the lowest id
+                async with db.execute(f"""
+                    SELECT cluster_id, relevance_score, areas_of_interest, summary, MIN(id)
+                    FROM articles
+                    WHERE processed = 1 AND cluster_id IN ({placeholders})
+                    GROUP BY cluster_id
+                """, chunk) as cursor:
+                    for row in await cursor.fetchall():
+                        analyses[row[0]] = dict(row)
+        return analyses
+    
+    async def get_cluster_members(self, cluster_id: str, exclude_url: Optional[str] = None) -> List[Dict]:
+        """Other reports of the same story ("also reported by"), oldest first"""
+        if not self._initialized:
+            await self.initialize()
+        
+        async with self._read() as db:
+            async with db.execute("""
+                SELECT url, title, source, scraped_date FROM articles
+                WHERE cluster_id = ? AND url != ?
+                ORDER BY scraped_date
+            """, (cluster_id, exclude_url or "")) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
     
     async def log_scraping_run(
         self,
@@ -133,13 +969,33 @@ class NewsDatabase:
             await self.initialize()
         
         run_date = datetime.now().isoformat()
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute("""
                 INSERT INTO scraping_log 
                 (source, run_date, articles_found, articles_new, status, error_message)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (source, run_date, articles_found, articles_new, status, error_message))
-            await db.commit()
+    
+    @staticmethod
+    def _relevant_articles_query(
+        limit: int,
+        min_relevance: float,
+        source: Optional[str] = None
+    ) -> Tuple[str, tuple]:
+        """SQL and parameters of get_relevant_articles (shared with benchmark_database.py)"""
+        if source:
+            return f"""
+                SELECT {NewsDatabase.LISTING_COLUMNS} FROM articles 
+                WHERE relevance_score >= ? AND source = ?
+                ORDER BY scraped_date DESC, relevance_score DESC
+                LIMIT ?
+            """, (min_relevance, source, limit)
+        return f"""
+            SELECT {NewsDatabase.LISTING_COLUMNS} FROM articles 
+            WHERE relevance_score >= ?
+            ORDER BY scraped_date DESC, relevance_score DESC
+            LIMIT ?
+        """, (min_relevance, limit)
     
     async def get_relevant_articles(
         self,
@@ -147,56 +1003,236 @@ class NewsDatabase:
         min_relevance: float = 0.7,
         source: Optional[str] = None
     ) -> List[Dict]:
-        """Get articles above relevance threshold"""
+        """Get articles above relevance threshold, most recently scraped first"""
         if not self._initialized:
             await self.initialize()
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            if source:
-                async with db.execute("""
-                    SELECT * FROM articles 
-                    WHERE relevance_score >= ? AND source = ?
-                    ORDER BY scraped_date DESC, relevance_score DESC
-                    LIMIT ?
-                """, (min_relevance, source, limit)) as cursor:
-                    rows = await cursor.fetchall()
-                    return [dict(row) for row in rows]
+        sql, params = self._relevant_articles_query(limit, min_relevance, source)
+        async with self._read() as db:
+            async with db.execute(sql, params) as cursor:
+                rows = await cursor.fetchall()
+                return [dict(row) for row in rows]
+    
+    @staticmethod
+    def page_cursor(article: Dict) -> str:
+        """Opaque position of an article for `after` (its scraped_date and id)"""
+        return f"{article['scraped_date']},{article['id']}"
+    
+    @staticmethod
+    def _parse_cursor(cursor: str) -> Tuple[str, int]:
+        scraped_date, _, article_id = cursor.rpartition(",")
+        if not scraped_date or not article_id.isdigit():
+            raise ValueError(f"Invalid page cursor: {cursor!r}")
+        return scraped_date, int(article_id)
+    
+    @staticmethod
+    def _page_query(
+        limit: int,
+        min_relevance: Optional[float] = None,
+        source: Optional[str] = None,
+        after: Optional[str] = None,
+        newest_first: bool = True
+    ) -> Tuple[str, list]:
+        """SQL and parameters of one keyset page (shared with benchmark_database.py)"""
+        conditions = []
+        params: list = []
+        if min_relevance is not None:
+            conditions.append("relevance_score >= ?")
+            params.append(min_relevance)
+        if source:
+            conditions.append("source = ?")
+            params.append(source)
+        if after:
+            # Seeks straight to the cursor in the index, however deep the page
+            conditions.append(f"(scraped_date, id) {'<' if newest_first else '>'} (?, ?)")
+            params.extend(NewsDatabase._parse_cursor(after))
+        direction = "DESC" if newest_first else "ASC"
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"""
+            SELECT {NewsDatabase.LISTING_COLUMNS} FROM articles
+            {where}
+            ORDER BY scraped_date {direction}, id {direction}
+            LIMIT ?
+        """, params + [limit]
+    
+    async def get_articles_page(
+        self,
+        limit: int = 50,
+        min_relevance: Optional[float] = None,
+        source: Optional[str] = None,
+        after: Optional[str] = None,
+        newest_first: bool = True
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of articles in (scraped_date, id) order, newest first by default
+        
+        Pass the returned cursor as `after` to get the next page; it is
+        None on the last page. Unlike OFFSET, a page deep in the archive
+        costs the same as the first one, and articles stored meanwhile
+        don't shift later pages.
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        sql, params = self._page_query(limit, min_relevance, source, after, newest_first)
+        async with self._read() as db:
+            async with db.execute(sql, params) as cursor:
+                rows = [dict(row) for row in await cursor.fetchall()]
+        next_cursor = self.page_cursor(rows[-1]) if len(rows) == limit else None
+        return rows, next_cursor
+    
+    async def iter_articles(
+        self,
+        min_relevance: Optional[float] = None,
+        source: Optional[str] = None,
+        after: Optional[str] = None,
+        newest_first: bool = False,
+        batch_size: int = 500
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream articles in (scraped_date, id) order, oldest first by default
+        
+        Reads `batch_size` rows at a time with keyset pages, so walking the
+        whole archive takes constant memory. The reader connection is
+        returned to the pool between batches rather than held (with an
+        open read transaction) for as long as the caller keeps iterating.
+        """
+        while True:
+            rows, after = await self.get_articles_page(batch_size, min_relevance, source, after, newest_first)
+            for row in rows:
+                yield row
+            if not after:
+                return
+    
+    async def get_articles_by_area(
+        self,
+        area: str,
+        limit: int = 50,
+        min_relevance: float = 0.0
+    ) -> List[Dict]:
+        """Most recently scraped articles tagged with an area of interest (case-insensitive)"""
+        if not self._initialized:
+            await self.initialize()
+        
+        async with self._read() as db:
+            # Walks the area's index range newest first; ids follow scrape order
+            columns = ", ".join(f"a.{column.strip()}" for column in self.LISTING_COLUMNS.split(","))
+            async with db.execute(f"""
+                SELECT {columns} FROM article_areas aa
+                JOIN articles a ON a.id = aa.article_id
+                WHERE aa.area = ? AND a.relevance_score >= ?
+                ORDER BY aa.article_id DESC
+                LIMIT ?
+            """, (area.strip().lower(), min_relevance, limit)) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+    
+    async def count_articles_by_area(self, min_relevance: Optional[float] = None) -> Dict[str, int]:
+        """Number of articles per area of interest, largest first"""
+        if not self._initialized:
+            await self.initialize()
+        
+        async with self._read() as db:
+            if min_relevance is None:
+                sql = "SELECT area, COUNT(*) AS count FROM article_areas GROUP BY area ORDER BY count DESC"
+                params = ()
             else:
-                async with db.execute("""
-                    SELECT * FROM articles 
-                    WHERE relevance_score >= ?
-                    ORDER BY scraped_date DESC, relevance_score DESC
-                    LIMIT ?
-                """, (min_relevance, limit)) as cursor:
+                sql = """
+                    SELECT aa.area, COUNT(*) AS count FROM article_areas aa
+                    JOIN articles a ON a.id = aa.article_id
+                    WHERE a.relevance_score >= ?
+                    GROUP BY aa.area
+                    ORDER BY count DESC
+                """
+                params = (min_relevance,)
+            async with db.execute(sql, params) as cursor:
+                return {row[0]: row[1] for row in await cursor.fetchall()}
+    
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        min_relevance: Optional[float] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Full-text search, best matches first (BM25)
+        
+        `query` uses FTS5 syntax: words must all appear (any word form,
+        e.g. "sanction" matches "sanctions"), "quoted phrases", OR, NOT and
+        prefix* are supported. Title matches weigh most, then summary, then
+        content. `since`/`until` are ISO dates compared with scraped_date.
+        Each result has a "snippet" of the best matching column with hits in [brackets].
+        """
+        if not self._initialized:
+            await self.initialize()
+        if not self._fts_available:
+            raise RuntimeError("Full-text search needs SQLite with FTS5")
+        
+        conditions = ["articles_fts MATCH ?"]
+        filters = []
+        if min_relevance is not None:
+            conditions.append("a.relevance_score >= ?")
+            filters.append(min_relevance)
+        if since:
+            conditions.append("a.scraped_date >= ?")
+            filters.append(since)
+        if until:
+            conditions.append("a.scraped_date < ?")
+            filters.append(until)
+        if source:
+            conditions.append("a.source = ?")
+            filters.append(source)
+        
+        sql = f"""
+            SELECT a.id, a.url, a.title, a.source, a.published_date, a.scraped_date,
+                   a.relevance_score, a.areas_of_interest, a.summary, a.cluster_id,
+                   bm25(articles_fts, 10.0, 5.0, 1.0) AS rank, c.content
+            FROM articles_fts
+            JOIN articles a ON a.id = articles_fts.rowid
+            LEFT JOIN article_contents c ON c.article_id = a.id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY rank
+            LIMIT ?
+        """
+        async with self._read() as db:
+            try:
+                async with db.execute(sql, [query, *filters, limit]) as cursor:
                     rows = await cursor.fetchall()
-                    return [dict(row) for row in rows]
+            except aiosqlite.OperationalError:
+                # Not valid FTS5 syntax (e.g. "covid-19" reads as a column filter),
+                # so search the words literally; a real error raises again below
+                query = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+                async with db.execute(sql, [query, *filters, limit]) as cursor:
+                    rows = await cursor.fetchall()
+        
+        terms = _query_terms(query)
+        results = []
+        for row in rows:
+            article = dict(row)
+            content = decompress_content(article.pop("content"))
+            article["snippet"] = _snippet([article["title"], article["summary"], content], terms)
+            results.append(article)
+        return results
     
     async def get_statistics(self) -> Dict:
         """Get scraping statistics"""
         if not self._initialized:
             await self.initialize()
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            # Total articles
-            async with db.execute("SELECT COUNT(*) FROM articles") as cursor:
-                total_articles = (await cursor.fetchone())[0]
-            
-            # Relevant articles
-            async with db.execute(
-                "SELECT COUNT(*) FROM articles WHERE relevance_score >= 0.5"
-            ) as cursor:
-                relevant_articles = (await cursor.fetchone())[0]
-            
-            # Articles by source
+        async with self._read() as db:
+            # Maintained on every insert/update, so this is one row per source
             async with db.execute("""
-                SELECT source, COUNT(*) as count 
-                FROM articles 
-                GROUP BY source 
-                ORDER BY count DESC
+                SELECT source, total, relevant
+                FROM article_counts
+                WHERE total > 0
+                ORDER BY total DESC
             """) as cursor:
-                by_source = {row[0]: row[1] for row in await cursor.fetchall()}
+                counts = await cursor.fetchall()
+            total_articles = sum(row[1] for row in counts)
+            relevant_articles = sum(row[2] for row in counts)
+            by_source = {row[0]: row[1] for row in counts}
             
             # Recent scraping runs
             async with db.execute("""
@@ -0,0 +1,83 @@
+"""
+Persistent HTTP validator cache for conditional GET requests
+"""
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+class HTTPValidatorCache:
+    def __init__(self, path: str = "http_cache.json", max_entries: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: Dict[str, Dict] = {}
+        self._dirty = False
+
+    def load(self):
+        """Load cached validators from disk"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.entries = data
+        except (OSError, ValueError) as e:
+            print(f"Could not load HTTP cache {self.path}: {str(e)}")
+            self.entries = {}
+
+    def save(self):
+        """Write cached validators to disk if anything changed"""
+        if not self._dirty:
+            return
+
+        # Evict the least recently validated URLs when over capacity
+        if self.max_entries and len(self.entries) > self.max_entries:
+            ordered = sorted(self.entries.items(), key=lambda item: item[1].get("validated", ""))
+            self.entries = dict(ordered[-self.max_entries:])
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Could not save HTTP cache {self.path}: {str(e)}")
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for a previously fetched URL"""
+        entry = self.entries.get(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url: str, response_headers) -> None:
+        """Store validators from a 200 response"""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            # Nothing to revalidate with next time
+            if self.entries.pop(url, None) is not None:
+                self._dirty = True
+            return
+
+        self.entries[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "validated": datetime.now().isoformat()
+        }
+        self._dirty = True
+
+    def touch(self, url: str) -> None:
+        """Mark a cached URL as revalidated by a 304 response"""
+        entry = self.entries.get(url)
+        if entry:
+            entry["validated"] = datetime.now().isoformat()
+            self._dirty = True
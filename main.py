@@ -3,18 +3,31 @@ Main orchestration script for news scraping and analysis
 """
 import asyncio
 import os
+import sys
 from datetime import datetime
 from dotenv import load_dotenv
 from scraper import NewsScraper
 from agent_analyzer import NewsAnalyzer
+from analyzer_backends import AnalyzerBackend
 from database import NewsDatabase
-from config import NEWS_SOURCES, AREAS_OF_INTEREST
+from config import NEWS_SOURCES, AREAS_OF_INTEREST, AREA_SYNONYMS, AGENT_CONFIG, DEDUP_CONFIG, PIPELINE_CONFIG
+from prefilter import KeywordPrefilter
+from near_duplicates import NearDuplicateClusterer
+from pipeline import ScrapeResult, StreamingPipeline, analyze_pending
+from typing import AsyncIterator, Dict, List, Optional
 
 # Load environment variables
 load_dotenv()
 
-async def main():
-    """Main function to orchestrate scraping and analysis"""
+async def main(command: str = "run"):
+    """
+    Main function to orchestrate scraping and analysis
+    
+    Commands:
+        run      Scrape, analyze and store in one streaming pass (default)
+        scrape   Only scrape; new articles are stored as unprocessed
+        analyze  Only analyze stored, unprocessed articles
+    """
     print("=" * 60)
     print("News Scraper with AI Analysis")
     print("=" * 60)
@@ -24,84 +37,151 @@ async def main():
     sources_to_use = NEWS_SOURCES[:max_sources] if max_sources else NEWS_SOURCES
 
     print(f"Areas of Interest: {', '.join(AREAS_OF_INTEREST)}")
-    print(f"Sources to scrape: {len(sources_to_use)}")
+    if command != "analyze":
+        print(f"Sources to scrape: {len(sources_to_use)}")
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
-    # Initialize database
-    db = NewsDatabase()
-    await db.initialize()
-    print("Database initialized\n")
-    
-    # Step 1: Scrape all sources
-    print("Step 1: Scraping news sources...")
-    print("-" * 60)
-    all_articles = []
-    
-    async with NewsScraper() as scraper:
-        all_articles = await scraper.scrape_all_sources(sources_to_use)
-    
-    print(f"\nTotal articles scraped: {len(all_articles)}")
-    
-    # Step 2: Filter out existing articles
-    print("\nStep 2: Checking for new articles...")
-    print("-" * 60)
-    new_articles = []
-    for article in all_articles:
-        exists = await db.article_exists(article["url"], article["title"])
-        if not exists:
-            new_articles.append(article)
-    
-    print(f"New articles found: {len(new_articles)}")
-    
-    if not new_articles:
-        print("No new articles to analyze. Exiting.")
-        return
-    
-    # Step 3: Analyze articles with AI agent
-    print("\nStep 3: Analyzing articles with AI agent...")
+    # Initialize database (connections stay open for the whole run)
+    async with NewsDatabase() as db:
+        print("Database initialized\n")
+        if command == "analyze":
+            await run_analysis(db)
+        else:
+            await run_pipeline(db, sources_to_use, analyze=(command == "run"))
+        await print_summary(db)
+
+async def run_pipeline(db: NewsDatabase, sources_to_use: List[Dict], analyze: bool = True):
+    """Scrape, deduplicate, analyze (optionally) and store articles"""
+    if analyze:
+        print("Scraping, analyzing and saving articles as each source finishes...")
+    else:
+        print("Scraping and saving articles for later analysis...")
     print("-" * 60)
-    analyzer = NewsAnalyzer()
-    analyzed_articles = await analyzer.analyze_batch(new_articles, rate_limit=0.5)
     
-    # Step 4: Save articles to database
-    print("\nStep 4: Saving articles to database...")
+    async with NewsScraper(known_url_lookup=db.get_existing_urls) as scraper:
+        await process_articles(db, scraper.iter_scraped_sources(sources_to_use), len(sources_to_use), analyze=analyze)
+        if scraper.not_modified_count:
+            print(f"{scraper.not_modified_count} pages unchanged since last run (HTTP 304)")
+
+def build_prefilter() -> Optional[KeywordPrefilter]:
+    """The keyword pre-filter configured in AGENT_CONFIG, if enabled"""
+    if AGENT_CONFIG.get("prefilter_min_score") is None:
+        return None
+    return KeywordPrefilter(
+        AREAS_OF_INTEREST,
+        AREA_SYNONYMS,
+        min_score=AGENT_CONFIG["prefilter_min_score"],
+        audit_rate=AGENT_CONFIG.get("prefilter_audit_rate", 0.0)
+    )
+
+async def build_clusterer(db: NewsDatabase) -> Optional[NearDuplicateClusterer]:
+    """A near-duplicate clusterer loaded with recent stored articles, if enabled"""
+    if not DEDUP_CONFIG.get("enabled"):
+        return None
+    clusterer = NearDuplicateClusterer(
+        max_distance=DEDUP_CONFIG.get("max_distance", 3),
+        shingle_size=DEDUP_CONFIG.get("shingle_size", 3),
+        min_words=DEDUP_CONFIG.get("min_words", 50),
+        relevance_threshold=AGENT_CONFIG.get("relevance_threshold", 0.5)
+    )
+    clusterer.add_stored(await db.get_dedup_candidates(DEDUP_CONFIG.get("lookback_days", 7)))
+    return clusterer
+
+def print_analysis_report(
+    analyzer: NewsAnalyzer,
+    prefilter: Optional[KeywordPrefilter],
+    outcomes: List[Dict]
+):
+    """Analysis cache and pre-filter statistics for a finished run"""
+    if analyzer.cache:
+        cache_stats = analyzer.cache.stats()
+        print(f"Analysis cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']} entries)")
+    
+    if prefilter:
+        report = prefilter.report(outcomes)
+        print(f"Pre-filter skip rate: {report['skip_rate']:.0%} ({report['skipped']}/{report['total']})")
+        print(f"Pre-filter escalated articles judged relevant: {report['escalated_relevant']}/{report['escalated']}")
+        if report["audited"]:
+            print(f"Pre-filter audit: {report['audit_missed']}/{report['audited']} below-floor articles were relevant")
+        if report["agreement"] is not None:
+            print(f"Pre-filter/LLM agreement: {report['agreement']:.0%}")
+
+async def process_articles(
+    db: NewsDatabase,
+    scraped: AsyncIterator[ScrapeResult],
+    total_sources: Optional[int] = None,
+    backend: Optional[AnalyzerBackend] = None,
+    analyze: bool = True
+) -> Dict:
+    """Deduplicate, analyze and store articles from (source_config, articles, error) results as they arrive"""
+    pipeline_options = {
+        "queue_size": PIPELINE_CONFIG.get("queue_size", 8),
+        "analysis_workers": PIPELINE_CONFIG.get("analysis_workers", 8),
+        "analysis_batch_size": PIPELINE_CONFIG.get("analysis_batch_size", 40),
+        "store_duplicate_content": DEDUP_CONFIG.get("store_duplicate_content", False)
+    }
+    
+    if not analyze:
+        stats = await StreamingPipeline(db, None, **pipeline_options).run(scraped, total_sources)
+        print(f"\nArticles scraped: {stats['scraped']} from {stats['sources'] - stats['failed_sources']} sources "
+              f"({stats['failed_sources']} failed)")
+        print(f"Saved {stats['saved']} new articles for analysis (run: python main.py analyze)")
+        return stats
+    
+    prefilter = build_prefilter()
+    clusterer = await build_clusterer(db)
+    async with NewsAnalyzer(backend=backend) as analyzer:
+        pipeline = StreamingPipeline(db, analyzer, prefilter=prefilter, clusterer=clusterer, **pipeline_options)
+        stats = await pipeline.run(scraped, total_sources)
+        
+        print(f"\nArticles scraped: {stats['scraped']} from {stats['sources'] - stats['failed_sources']} sources "
+              f"({stats['failed_sources']} failed)")
+        print(f"New articles: {stats['new']}")
+        if clusterer:
+            print(f"Near-duplicates: {stats['duplicates']} articles share a story with another report "
+                  f"and reuse its analysis")
+        if prefilter:
+            print(f"Keyword pre-filter: {stats['skipped']} articles skipped")
+        print(f"Analyzed by the AI agent: {stats['analyzed']}")
+        print_analysis_report(analyzer, prefilter, pipeline.outcomes)
+    
+    print(f"Saved {stats['saved']} new articles")
+    print(f"Relevant articles: {stats['relevant']}")
+    return stats
+
+async def run_analysis(db: NewsDatabase, backend: Optional[AnalyzerBackend] = None) -> Dict:
+    """Analyze stored articles that have not been processed yet"""
+    print(f"Analyzing {await db.count_pending()} unprocessed articles...")
     print("-" * 60)
-    saved_count = 0
-    relevant_count = 0
     
-    for article in analyzed_articles:
-        saved = await db.save_article(
-            url=article["url"],
-            title=article["title"],
-            content=article.get("content", ""),
-            source=article["source"],
-            published_date=article.get("date"),
-            relevance_score=article.get("relevance_score"),
-            areas_of_interest=article.get("areas_of_interest", []),
-            summary=article.get("summary")
+    prefilter = build_prefilter()
+    clusterer = await build_clusterer(db)
+    async with NewsAnalyzer(backend=backend) as analyzer:
+        stats = await analyze_pending(
+            db,
+            analyzer,
+            prefilter=prefilter,
+            clusterer=clusterer,
+            batch_size=PIPELINE_CONFIG.get("claim_batch_size", 100),
+            stale_after_minutes=PIPELINE_CONFIG.get("claim_timeout_minutes", 30)
         )
-        if saved:
-            saved_count += 1
-            if article.get("relevant", False):
-                relevant_count += 1
-    
-    print(f"Saved {saved_count} new articles")
-    print(f"Relevant articles: {relevant_count}")
-    
-    # Step 5: Log scraping run
-    for source_config in NEWS_SOURCES:
-        source_articles = [a for a in all_articles if a["source"] == source_config["name"]]
-        new_source_articles = [a for a in new_articles if a["source"] == source_config["name"]]
         
-        await db.log_scraping_run(
-            source=source_config["name"],
-            articles_found=len(source_articles),
-            articles_new=len(new_source_articles),
-            status="success"
-        )
-    
-    # Step 6: Display summary
+        print(f"\nArticles claimed: {stats['claimed']}")
+        if clusterer:
+            print(f"Near-duplicates: {stats['duplicates']} articles reuse the analysis of another report")
+        if prefilter:
+            print(f"Keyword pre-filter: {stats['skipped']} articles skipped")
+        print(f"Analyzed by the AI agent: {stats['analyzed']}")
+        print_analysis_report(analyzer, prefilter, stats["outcomes"])
+    
+    print(f"Completed {stats['completed']} articles ({stats['claimed'] - stats['completed']} failed, left for a later run)")
+    print(f"Relevant articles: {stats['relevant']}")
+    return stats
+
+async def print_summary(db: NewsDatabase):
+    """Print database totals and the top relevant articles"""
     print("\n" + "=" * 60)
     print("Summary")
     print("=" * 60)
@@ -135,13 +215,22 @@ async def run_daily_update():
     await main()
 
 if __name__ == "__main__":
-    # Check for OpenAI API key
-    if not os.getenv("OPENAI_API_KEY"):
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else "run"
+    if command not in ("run", "scrape", "analyze"):
+        print(f"Unknown command: {command}")
+        print("\nAvailable commands:")
+        print("  run      - Scrape, analyze and store articles (default)")
+        print("  scrape   - Scrape and store articles without analyzing them")
+        print("  analyze  - Analyze stored articles that have not been processed yet")
+        exit(1)
+    
+    # Check for OpenAI API key (scraping alone doesn't need one)
+    if command != "scrape" and not os.getenv("OPENAI_API_KEY"):
         print("ERROR: OPENAI_API_KEY environment variable not set!")
         print("Please set it using: export OPENAI_API_KEY=your_key_here")
         exit(1)
     
     # Run the main function
-    asyncio.run(main())
+    asyncio.run(main(command))
 
 
@@ -0,0 +1,190 @@
+"""
+Near-duplicate clustering of articles by SimHash over content shingles
+"""
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+_MASK64 = (1 << 64) - 1
+
+def article_hash(url: str, title: str) -> str:
+    """The articles.hash value for a url/title pair"""
+    return hashlib.md5(f"{url}{title}".encode('utf-8')).hexdigest()
+
+def simhash(text: str, shingle_size: int = 3, min_words: int = 50) -> Optional[int]:
+    """
+    64-bit SimHash of a text's word shingles, or None if the text is too short
+
+    Returned as a signed integer so it fits an SQLite INTEGER column.
+    Texts that share most of their shingles end up a few bits apart.
+    """
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) < min_words:
+        return None
+
+    shingles = {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+    # Bit i of the fingerprint is set when most shingle hashes have it set;
+    # counting over columns of binary strings keeps the loop in C
+    hashes = [
+        format(int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+        for shingle in shingles
+    ]
+    majority = len(hashes) / 2
+    fingerprint = int("".join("1" if column.count("1") > majority else "0" for column in zip(*hashes)), 2)
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & _MASK64).count("1")
+
+def stored_analysis(row: Dict, relevance_threshold: float = 0.5) -> Optional[Dict]:
+    """The analysis fields of a stored article row, or None if it has no score"""
+    score = row.get("relevance_score")
+    if score is None:
+        return None
+    areas = row.get("areas_of_interest")
+    return {
+        "relevant": score >= relevance_threshold,
+        "relevance_score": score,
+        "areas_of_interest": areas.split(",") if areas else [],
+        "summary": row.get("summary")
+    }
+
+class NearDuplicateClusterer:
+    """
+    Groups articles whose content fingerprints are within `max_distance` bits
+
+    Fingerprints are indexed by `max_distance + 1` bands of bits: two
+    fingerprints that differ in at most `max_distance` bits must agree on
+    at least one band, so candidates are found without comparing every
+    pair. Each article gets a "cluster_id" (the hash of the first article
+    seen in its cluster, which may be a stored one). Only the first
+    article of a cluster in a run needs analyzing; see split() and
+    propagate().
+    """
+
+    ANALYSIS_FIELDS = ("relevant", "relevance_score", "areas_of_interest", "summary", "analysis_error")
+
+    def __init__(
+        self,
+        max_distance: int = 3,
+        shingle_size: int = 3,
+        min_words: int = 50,
+        relevance_threshold: float = 0.5
+    ):
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.relevance_threshold = relevance_threshold
+        self.band_count = max_distance + 1
+        self.band_bits = 64 // self.band_count
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(self.band_count)]
+        self._entries: List[Dict] = []  # fingerprint, cluster_id and (once known) the analysis
+        self._by_url: Dict[str, Dict] = {}  # Entries of articles from this run
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [fingerprint >> (i * self.band_bits) & mask for i in range(self.band_count)]
+
+    def _find(self, fingerprint: int) -> Optional[Dict]:
+        """Closest indexed entry within max_distance"""
+        best, best_distance = None, self.max_distance + 1
+        seen = set()
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            for position in band.get(key, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                entry = self._entries[position]
+                distance = hamming_distance(fingerprint, entry["simhash"])
+                if distance < best_distance:
+                    best, best_distance = entry, distance
+        return best
+
+    def _add(self, entry: Dict):
+        position = len(self._entries)
+        self._entries.append(entry)
+        for band, key in zip(self._bands, self._band_keys(entry["simhash"])):
+            band.setdefault(key, []).append(position)
+
+    def fingerprint(self, article: Dict) -> Optional[int]:
+        return simhash(article.get("content", ""), self.shingle_size, self.min_words)
+
+    def add_stored(self, rows: List[Dict]):
+        """
+        Index already stored articles (dicts from NewsDatabase.get_dedup_candidates)
+
+        Rows without a stored fingerprint are fingerprinted from their content.
+        """
+        for row in rows:
+            fingerprint = row.get("simhash")
+            if fingerprint is None:
+                fingerprint = self.fingerprint(row)
+            if fingerprint is None:
+                continue
+            self._add({
+                "simhash": fingerprint,
+                "cluster_id": row.get("cluster_id") or row["hash"],
+                "analysis": stored_analysis(row, self.relevance_threshold)
+            })
+
+    def split(self, articles: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split articles into (representatives, duplicates)
+
+        Every fingerprinted article is returned with "simhash" and
+        "cluster_id" set. A duplicate of a stored article (or of one
+        passed to record_analysis) comes back with that analysis already
+        applied; a duplicate of another article still being analyzed
+        carries "duplicate_of" (that article's URL) and gets its analysis
+        from propagate().
+        """
+        representatives = []
+        duplicates = []
+        for article in articles:
+            fingerprint = self.fingerprint(article)
+            if fingerprint is None:
+                representatives.append(article)
+                continue
+
+            match = self._find(fingerprint)
+            if match is None:
+                cluster_id = article_hash(article["url"], article["title"])
+                entry = {"simhash": fingerprint, "cluster_id": cluster_id, "url": article["url"]}
+                self._add(entry)
+                self._by_url[article["url"]] = entry
+                representatives.append({**article, "simhash": fingerprint, "cluster_id": cluster_id})
+                continue
+
+            article = {**article, "simhash": fingerprint, "cluster_id": match["cluster_id"]}
+            if match.get("analysis"):
+                duplicates.append({**article, **match["analysis"]})
+            elif match.get("url"):
+                duplicates.append({**article, "duplicate_of": match["url"]})
+            else:
+                # Stored cluster that was never analyzed, so analyze this copy
+                representatives.append(article)
+        return representatives, duplicates
+
+    def record_analysis(self, article: Dict):
+        """
+        Remember a representative's analysis, so later duplicates of it
+        (e.g. from sources that finish after it was analyzed) take it
+        directly instead of waiting for propagate()
+        """
+        entry = self._by_url.get(article.get("url"))
+        if entry is not None and article.get("relevance_score") is not None and not article.get("analysis_error"):
+            entry["analysis"] = {field: article.get(field) for field in self.ANALYSIS_FIELDS}
+
+    def propagate(self, analyzed: List[Dict], duplicates: List[Dict]) -> List[Dict]:
+        """Copy each representative's analysis onto its in-batch duplicates"""
+        by_url = {article["url"]: article for article in analyzed}
+        resolved = []
+        for duplicate in duplicates:
+            representative = by_url.get(duplicate.get("duplicate_of"))
+            if representative is not None:
+                duplicate = {
+                    **duplicate,
+                    **{field: representative.get(field) for field in self.ANALYSIS_FIELDS}
+                }
+            resolved.append(duplicate)
+        return resolved
@@ -0,0 +1,370 @@
+"""
+HTML and RSS parsing, runnable off the event loop in a thread or process pool
+
+The parse functions are module-level so they can be pickled into worker
+processes; they take raw page bytes (or text) and return plain dicts/lists.
+"""
+import asyncio
+import multiprocessing
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache, partial
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple, Union
+from urllib.parse import urljoin, urlparse
+import feedparser
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+from config import COMMON_SELECTORS
+
+PageContent = Union[str, bytes]
+
+def parse_article_links(html: PageContent, source_config: Dict, max_articles: int) -> List[str]:
+    """Extract article links from homepage"""
+    soup = BeautifulSoup(html, 'lxml')
+    selectors = source_config.get("selectors", COMMON_SELECTORS)
+    link_selector = selectors.get("article_links", "a")
+
+    links = []
+    base_url = source_config["url"]
+    base_domain = urlparse(base_url).netloc
+
+    for link in soup.select(link_selector):
+        href = link.get('href')
+        if href:
+            # Convert relative URLs to absolute
+            full_url = urljoin(base_url, href)
+            # Only include URLs from the same domain
+            if urlparse(full_url).netloc == base_domain:
+                links.append(full_url)
+
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_links = []
+    for link in links:
+        if link not in seen:
+            seen.add(link)
+            unique_links.append(link)
+
+    return unique_links[:max_articles]
+
+# Candidate selectors tried in order after the source's own selector
+TITLE_FALLBACKS = ["h1", ".article-title", ".post-title", ".headline", "title"]
+CONTENT_FALLBACKS = ["article", "main", ".content", ".article-content", ".post-content", ".entry-content"]
+DATE_FALLBACKS = ["time", ".date", ".published-date", ".article-date", "[datetime]"]
+
+def parse_article_content(
+    html: PageContent,
+    source_config: Dict,
+    engine: str = "lxml"
+) -> Dict[str, Optional[str]]:
+    """Extract article title, content, and date with the configured engine"""
+    if engine == "lxml":
+        try:
+            return parse_article_content_lxml(html, source_config)
+        except Exception:
+            # Unsupported selector or unparseable markup, let BeautifulSoup try
+            pass
+    return parse_article_content_soup(html, source_config)
+
+def parse_article_content_soup(html: PageContent, source_config: Dict) -> Dict[str, Optional[str]]:
+    """Extract article title, content, and date using BeautifulSoup"""
+    soup = BeautifulSoup(html, 'lxml')
+    selectors = source_config.get("selectors", COMMON_SELECTORS)
+
+    # Extract title
+    title = None
+    title_selectors = [selectors.get("title")] + TITLE_FALLBACKS
+    for selector in title_selectors:
+        if selector:
+            element = soup.select_one(selector)
+            if element:
+                title = element.get_text(strip=True)
+                if title and len(title) > 5:  # Ensure meaningful title
+                    break
+
+    # Extract content
+    content = None
+    content_selectors = [selectors.get("content")] + CONTENT_FALLBACKS
+    for selector in content_selectors:
+        if selector:
+            element = soup.select_one(selector)
+            if element:
+                # Remove script and style elements
+                for script in element(["script", "style", "nav", "footer", "header", "aside"]):
+                    script.decompose()
+                content = element.get_text(separator="\n", strip=True)
+                if len(content) > 100:  # Ensure we have substantial content
+                    break
+
+    # Extract date
+    date = None
+    date_selectors = [selectors.get("date")] + DATE_FALLBACKS
+    for selector in date_selectors:
+        if selector:
+            element = soup.select_one(selector)
+            if element:
+                date = element.get('datetime') or element.get_text(strip=True)
+                if date:
+                    break
+
+    return {
+        "title": title or "No title found",
+        "content": content or "",
+        "date": date
+    }
+
+# Text under these tags is never part of get_text() output
+_NON_TEXT_TAGS = frozenset(["script", "style", "template"])
+_CONTENT_SKIP_TAGS = _NON_TEXT_TAGS | {"nav", "footer", "header", "aside"}
+
+# tag, .class, tag.class.class, [attr] and comma-separated lists of those
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)(?:\[([\w-]+)\])?$")
+
+class _CompiledSelector:
+    """A CSS selector matched against elements during a single tree walk"""
+
+    def __init__(self, css: str):
+        self.alternatives: List[Tuple[Optional[str], FrozenSet[str], Optional[str]]] = []
+        self.xpath = None
+
+        for part in css.split(","):
+            match = _SIMPLE_SELECTOR.match(part.strip())
+            if not match or not any(match.groups()):
+                # Combinators, pseudo-classes etc. need cssselect's XPath
+                # translation (raises ImportError if cssselect is missing)
+                from lxml.cssselect import CSSSelector
+                self.alternatives = []
+                self.xpath = CSSSelector(css)
+                return
+            tag, classes, attr = match.groups()
+            self.alternatives.append((
+                tag.lower() if tag else None,
+                frozenset(classes.split(".")[1:]) if classes else frozenset(),
+                attr
+            ))
+
+    def matches(self, tag: str, classes: Set[str], attrib) -> bool:
+        for want_tag, want_classes, want_attr in self.alternatives:
+            if want_tag and want_tag != tag:
+                continue
+            if want_classes and not want_classes <= classes:
+                continue
+            if want_attr and want_attr not in attrib:
+                continue
+            return True
+        return False
+
+@lru_cache(maxsize=256)
+def _compile_selector(css: str) -> _CompiledSelector:
+    return _CompiledSelector(css)
+
+def _first_matches(root, selectors: List[str]) -> Dict[str, object]:
+    """First element in document order for each selector, from one walk of the tree"""
+    compiled = {css: _compile_selector(css) for css in selectors}
+    found = {}
+
+    pending = {css: sel for css, sel in compiled.items() if sel.xpath is None}
+    for element in root.iter():
+        if not pending:
+            break
+        tag = element.tag
+        if not isinstance(tag, str):  # Comments and processing instructions
+            continue
+        classes = set(element.get("class", "").split())
+        for css, selector in list(pending.items()):
+            if selector.matches(tag, classes, element.attrib):
+                found[css] = element
+                del pending[css]
+
+    for css, selector in compiled.items():
+        if selector.xpath is not None:
+            results = selector.xpath(root)
+            if results:
+                found[css] = results[0]
+
+    return found
+
+def _element_text(element, skip_tags: FrozenSet[str], separator: str) -> str:
+    """Equivalent of BeautifulSoup's get_text(separator, strip=True), skipping subtrees"""
+    strings = []
+    if element.text:
+        strings.append(element.text)
+    stack = []
+    for child in reversed(element):
+        if child.tail:
+            stack.append(child.tail)
+        stack.append(child)
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            strings.append(node)
+            continue
+        if not isinstance(node.tag, str) or node.tag in skip_tags:
+            continue
+        if node.text:
+            strings.append(node.text)
+        for child in reversed(node):
+            if child.tail:
+                stack.append(child.tail)
+            stack.append(child)
+
+    return separator.join(text.strip() for text in strings if text.strip())
+
+def _lxml_document(html: PageContent):
+    if isinstance(html, bytes):
+        # libxml2 assumes latin-1 without a meta charset, so prefer UTF-8
+        try:
+            html = html.decode("utf-8")
+        except UnicodeDecodeError:
+            return lxml_html.document_fromstring(html)
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # Unicode input with an XML encoding declaration
+        return lxml_html.document_fromstring(html.encode("utf-8"))
+
+def parse_article_content_lxml(html: PageContent, source_config: Dict) -> Dict[str, Optional[str]]:
+    """
+    Extract article title, content, and date using lxml
+
+    Same selection rules as the BeautifulSoup engine, but all candidate
+    selectors are resolved in one walk of the tree and nothing is removed
+    from it, so no soup object is built.
+    """
+    root = _lxml_document(html)
+    selectors = source_config.get("selectors", COMMON_SELECTORS)
+
+    title_selectors = [sel for sel in [selectors.get("title")] + TITLE_FALLBACKS if sel]
+    content_selectors = [sel for sel in [selectors.get("content")] + CONTENT_FALLBACKS if sel]
+    date_selectors = [sel for sel in [selectors.get("date")] + DATE_FALLBACKS if sel]
+    found = _first_matches(root, list(dict.fromkeys(title_selectors + content_selectors + date_selectors)))
+
+    # Extract title
+    title = None
+    for selector in title_selectors:
+        element = found.get(selector)
+        if element is not None:
+            title = _element_text(element, _NON_TEXT_TAGS, "")
+            if title and len(title) > 5:  # Ensure meaningful title
+                break
+
+    # Extract content
+    content = None
+    for selector in content_selectors:
+        element = found.get(selector)
+        if element is not None:
+            content = _element_text(element, _CONTENT_SKIP_TAGS, "\n")
+            if len(content) > 100:  # Ensure we have substantial content
+                break
+
+    # Extract date
+    date = None
+    for selector in date_selectors:
+        element = found.get(selector)
+        if element is not None:
+            date = element.get('datetime') or _element_text(element, _NON_TEXT_TAGS, "")
+            if date:
+                break
+
+    return {
+        "title": title or "No title found",
+        "content": content or "",
+        "date": date
+    }
+
+def parse_rss_feed(feed_content: PageContent, source_config: Dict, max_articles: int) -> Dict:
+    """
+    Parse an RSS/Atom feed into article dicts
+
+    Returns:
+        {
+            "articles": List[Dict],
+            "error": Optional[str]  # set when the feed could not be parsed
+        }
+    """
+    feed = feedparser.parse(feed_content)
+
+    if feed.bozo and feed.bozo_exception:
+        return {"articles": [], "error": str(feed.bozo_exception)}
+
+    articles = []
+
+    for entry in feed.entries[:max_articles]:
+        # Extract article data from RSS entry
+        title = entry.get("title", "No title")
+        link = entry.get("link", "")
+
+        # Get content - try different fields
+        content = ""
+        if "content" in entry:
+            content = entry.content[0].value if isinstance(entry.content, list) else str(entry.content)
+        elif "summary" in entry:
+            content = entry.summary
+        elif "description" in entry:
+            content = entry.description
+
+        # Get published date
+        published_date = None
+        if "published_parsed" in entry and entry.published_parsed:
+            try:
+                published_date = datetime(*entry.published_parsed[:6]).isoformat()
+            except:
+                pass
+        elif "published" in entry:
+            published_date = entry.published
+
+        # Clean HTML from content if present
+        if content:
+            soup = BeautifulSoup(content, 'html.parser')
+            content = soup.get_text(separator="\n", strip=True)
+
+        if title and link:
+            articles.append({
+                "url": link,
+                "source": source_config["name"],
+                "title": title,
+                "content": content,
+                "date": published_date
+            })
+
+    return {"articles": articles, "error": None}
+
+class ParsingExecutor:
+    """Runs parse functions in a process pool, a thread pool, or inline"""
+
+    MODES = ("process", "thread", "inline")
+
+    def __init__(self, mode: str = "process", max_workers: Optional[int] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown parser executor mode: {mode} (expected one of {', '.join(self.MODES)})")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+
+    def start(self):
+        """Create the worker pool"""
+        if self.mode == "process":
+            # Forking a process that already runs aiosqlite and event loop threads
+            # can leave locks held in the child, so start workers from a clean process
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context(method)
+            )
+        elif self.mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="parser")
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run a parse function and await its result"""
+        if self.mode == "inline" or self._executor is None:
+            return func(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
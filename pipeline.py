@@ -0,0 +1,303 @@
+"""
+Streaming scrape -> dedup -> analyze -> save pipeline
+"""
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from agent_analyzer import NewsAnalyzer
+from database import NewsDatabase
+from near_duplicates import NearDuplicateClusterer, stored_analysis
+from prefilter import KeywordPrefilter
+
+ScrapeResult = Tuple[Dict, List[Dict], Optional[Exception]]
+
+class StreamingPipeline:
+    """
+    Runs the pipeline stages concurrently, connected by bounded queues
+
+    Each source's articles are deduplicated, analyzed and saved as soon as
+    the source finishes, while other sources are still being scraped. The
+    queues hold at most `queue_size` batches, so a slow stage pauses the
+    ones feeding it (backpressure) instead of letting articles pile up in
+    memory, and a crash only loses the batches in flight.
+
+    Without an analyzer (`python main.py scrape`) articles go straight from
+    dedup to save and are stored as unprocessed, for analyze_pending().
+
+    Stages:
+        dedup   (1 worker): drops stored and already seen articles, logs the
+                scraping run, clusters near-duplicates and applies the
+                keyword pre-filter
+        analyze (`analysis_workers`): runs analyze_batch on batches of up
+                to `analysis_batch_size` articles; all workers share the
+                analyzer's concurrency and RPM/TPM limits
+        save    (1 worker): copies analyses onto waiting near-duplicates and
+                stores each batch in one transaction
+    """
+
+    OUTCOME_FIELDS = ("prefilter_score", "prefilter_audit", "prefilter_skipped", "relevant")
+
+    def __init__(
+        self,
+        db: NewsDatabase,
+        analyzer: Optional[NewsAnalyzer],
+        prefilter: Optional[KeywordPrefilter] = None,
+        clusterer: Optional[NearDuplicateClusterer] = None,
+        queue_size: int = 8,
+        analysis_workers: int = 4,
+        analysis_batch_size: int = 40,
+        store_duplicate_content: bool = False,
+        show_progress: bool = True
+    ):
+        self.db = db
+        self.analyzer = analyzer
+        self.prefilter = prefilter
+        self.clusterer = clusterer
+        self.queue_size = max(1, queue_size)
+        self.analysis_workers = max(1, analysis_workers) if analyzer else 0
+        self.analysis_batch_size = max(1, analysis_batch_size)
+        self.store_duplicate_content = store_duplicate_content
+        self.show_progress = show_progress
+
+        self.stats = {
+            "sources": 0, "failed_sources": 0, "scraped": 0, "new": 0, "duplicates": 0,
+            "skipped": 0, "analyzed": 0, "saved": 0, "relevant": 0
+        }
+        # Pre-filter fields of every article it scored, for KeywordPrefilter.report
+        self.outcomes: List[Dict] = []
+        self._seen_urls = set()
+        self._waiting: Dict[str, List[Dict]] = {}  # Near-duplicates by the URL of their representative
+
+    def _log(self, message: str):
+        if self.show_progress:
+            print(message)
+
+    async def run(self, scraped: AsyncIterator[ScrapeResult], total_sources: Optional[int] = None) -> Dict:
+        """Consume (source_config, articles, error) results until exhausted; returns self.stats"""
+        dedup_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        analyze_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        save_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        remaining_analyzers = self.analysis_workers
+
+        async def feed():
+            async for result in scraped:
+                await dedup_queue.put(result)
+            await dedup_queue.put(None)
+
+        async def dedup():
+            while True:
+                result = await dedup_queue.get()
+                if result is None:
+                    break
+                await self._dedup_source(*result, total_sources, analyze_queue, save_queue)
+            for _ in range(self.analysis_workers):
+                await analyze_queue.put(None)
+            if not self.analysis_workers:
+                await save_queue.put(None)
+
+        async def analyze():
+            nonlocal remaining_analyzers
+            while True:
+                batch = await analyze_queue.get()
+                if batch is None:
+                    break
+                analyzed = await self.analyzer.analyze_batch(batch, show_progress=False)
+                self.stats["analyzed"] += len(analyzed)
+                await save_queue.put(analyzed)
+            remaining_analyzers -= 1
+            if remaining_analyzers == 0:
+                await save_queue.put(None)
+
+        async def save():
+            while True:
+                batch = await save_queue.get()
+                if batch is None:
+                    break
+                await self._save_batch(batch)
+            # Representatives that never came back (shouldn't happen) leave their copies unanalyzed
+            leftovers = [article for waiting in self._waiting.values() for article in waiting]
+            if leftovers:
+                self._waiting.clear()
+                await self._save_batch(leftovers)
+
+        tasks = [
+            asyncio.create_task(feed()),
+            asyncio.create_task(dedup()),
+            *(asyncio.create_task(analyze()) for _ in range(self.analysis_workers)),
+            asyncio.create_task(save())
+        ]
+        try:
+            # If any stage fails, stop the others rather than leave them blocked on a queue
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception():
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return self.stats
+
+    async def _dedup_source(
+        self,
+        source_config: Dict,
+        articles: List[Dict],
+        error: Optional[Exception],
+        total_sources: Optional[int],
+        analyze_queue: asyncio.Queue,
+        save_queue: asyncio.Queue
+    ):
+        self.stats["sources"] += 1
+        progress = f"[{self.stats['sources']}/{total_sources}]" if total_sources else f"[{self.stats['sources']}]"
+        if error:
+            self.stats["failed_sources"] += 1
+            self._log(f"{progress} Error scraping {source_config['name']}: {str(error)}")
+            await self.db.log_scraping_run(source_config["name"], 0, 0, status="error", error_message=str(error))
+            return
+
+        # Also drop articles another source already delivered in this run
+        new_articles = [a for a in await self.db.filter_new(articles) if a["url"] not in self._seen_urls]
+        self._seen_urls.update(a["url"] for a in new_articles)
+        self.stats["scraped"] += len(articles)
+        self.stats["new"] += len(new_articles)
+        await self.db.log_scraping_run(source_config["name"], len(articles), len(new_articles))
+
+        if not self.analyzer:
+            self._log(f"{progress} Finished {source_config['name']}: {len(articles)} articles, {len(new_articles)} new")
+            if new_articles:
+                await save_queue.put(new_articles)
+            return
+
+        representatives, duplicates = new_articles, []
+        if self.clusterer:
+            representatives, duplicates = self.clusterer.split(new_articles)
+            self.stats["duplicates"] += len(duplicates)
+            # Marked so _save_batch can drop their text once they have an analysis
+            duplicates = [{**article, "near_duplicate": True} for article in duplicates]
+        to_analyze, skipped = representatives, []
+        if self.prefilter:
+            to_analyze, skipped = self.prefilter.split(representatives)
+            self.stats["skipped"] += len(skipped)
+        self._log(
+            f"{progress} Finished {source_config['name']}: {len(articles)} articles, {len(new_articles)} new, "
+            f"{len(duplicates)} near-duplicates, {len(to_analyze)} to analyze"
+        )
+
+        # Duplicates of stored or already analyzed stories are complete
+        ready = list(skipped)
+        for duplicate in duplicates:
+            if duplicate.get("duplicate_of"):
+                self._waiting.setdefault(duplicate["duplicate_of"], []).append(duplicate)
+            else:
+                ready.append(duplicate)
+        if ready:
+            await save_queue.put(ready)
+        for i in range(0, len(to_analyze), self.analysis_batch_size):
+            await analyze_queue.put(to_analyze[i:i + self.analysis_batch_size])
+
+    async def _save_batch(self, articles: List[Dict]):
+        batch = list(articles)
+        if self.clusterer:
+            for article in articles:
+                self.clusterer.record_analysis(article)
+                waiting = self._waiting.pop(article["url"], None)
+                if waiting:
+                    batch.extend(self.clusterer.propagate([article], waiting))
+
+        if not self.store_duplicate_content:
+            # Only copies with a usable analysis; a failed one stays unprocessed
+            # and must keep its text to be analyzed again later
+            batch = [
+                {**article, "content": None}
+                if article.get("near_duplicate") and NewsDatabase._is_processed(article) else article
+                for article in batch
+            ]
+        saved_flags = await self.db.save_articles(batch)
+        saved = sum(saved_flags)
+        relevant = sum(1 for article, flag in zip(batch, saved_flags) if flag and article.get("relevant"))
+        self.stats["saved"] += saved
+        self.stats["relevant"] += relevant
+        self.outcomes.extend(
+            {k: a[k] for k in self.OUTCOME_FIELDS if k in a} for a in batch if "prefilter_score" in a
+        )
+        self._log(f"  Saved {saved} articles ({relevant} relevant); {self.stats['saved']} saved so far")
+
+async def analyze_pending(
+    db: NewsDatabase,
+    analyzer: NewsAnalyzer,
+    prefilter: Optional[KeywordPrefilter] = None,
+    clusterer: Optional[NearDuplicateClusterer] = None,
+    batch_size: int = 100,
+    stale_after_minutes: float = 30,
+    show_progress: bool = True
+) -> Dict:
+    """
+    Analyze stored, unprocessed articles until none are left
+
+    Claims `batch_size` articles at a time, so several workers can run at
+    once and a crashed worker's batch is picked up again once its claim
+    goes stale. Near-duplicates and the keyword pre-filter are applied as
+    in the streaming pipeline. Failed analyses stay unprocessed for a
+    later run.
+    """
+    stats = {"claimed": 0, "duplicates": 0, "skipped": 0, "analyzed": 0, "completed": 0, "relevant": 0}
+    outcomes: List[Dict] = []
+    relevance_threshold = analyzer.config.get("relevance_threshold", 0.5)
+    # Near-duplicates stored without their text can't be analyzed themselves;
+    # they take their cluster's analysis once another member has one
+    textless: List[Dict] = []
+    while True:
+        claimed = await db.claim_pending(batch_size, stale_after_minutes)
+        if not claimed:
+            break
+        stats["claimed"] += len(claimed)
+        textless.extend(a for a in claimed if a.get("content") is None and a.get("cluster_id"))
+        claimed = [a for a in claimed if not (a.get("content") is None and a.get("cluster_id"))]
+
+        representatives, duplicates = claimed, []
+        if clusterer:
+            representatives, duplicates = clusterer.split(claimed)
+            stats["duplicates"] += len(duplicates)
+        to_analyze, skipped = representatives, []
+        if prefilter:
+            to_analyze, skipped = prefilter.split(representatives)
+            stats["skipped"] += len(skipped)
+
+        analyzed = await analyzer.analyze_batch(to_analyze, show_progress=False) + skipped
+        stats["analyzed"] += len(to_analyze)
+        if clusterer:
+            for article in analyzed:
+                clusterer.record_analysis(article)
+            analyzed += clusterer.propagate(analyzed, duplicates)
+
+        completed = await db.save_analyses(analyzed)
+        relevant = sum(1 for a in analyzed if a.get("relevant") and not a.get("analysis_error"))
+        stats["completed"] += completed
+        stats["relevant"] += relevant
+        outcomes.extend(
+            {k: a[k] for k in StreamingPipeline.OUTCOME_FIELDS if k in a} for a in analyzed if "prefilter_score" in a
+        )
+        if show_progress:
+            print(f"Analyzed {len(claimed)} articles ({completed} completed, {relevant} relevant); "
+                  f"{stats['completed']} completed so far")
+        textless = await _link_textless(db, textless, relevance_threshold, stats)
+    # Unlinked ones keep their claim and are retried once it goes stale
+    stats["outcomes"] = outcomes
+    return stats
+
+async def _link_textless(db: NewsDatabase, articles: List[Dict], relevance_threshold: float, stats: Dict) -> List[Dict]:
+    """Complete text-less duplicates from their cluster's analysis; returns the ones still waiting"""
+    if not articles:
+        return []
+    analyses = await db.get_cluster_analyses([a["cluster_id"] for a in articles])
+    linked, waiting = [], []
+    for article in articles:
+        analysis = analyses.get(article["cluster_id"])
+        if analysis:
+            linked.append({**article, **stored_analysis(analysis, relevance_threshold)})
+        else:
+            waiting.append(article)
+    if linked:
+        stats["duplicates"] += len(linked)
+        stats["completed"] += await db.save_analyses(linked)
+        stats["relevant"] += sum(1 for a in linked if a["relevant"])
+    return waiting
@@ -0,0 +1,152 @@
+"""
+Local keyword pre-filter that decides which articles are worth an LLM call
+"""
+import hashlib
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+class KeywordPrefilter:
+    """
+    Scores articles against the areas of interest with one precompiled regex
+
+    Each area contributes its own name plus any synonyms, matched as whole
+    words (case-insensitive, optional plural, flexible spaces/hyphens); a
+    trailing "*" makes a term a prefix, e.g. "cyber*". Title matches count
+    `title_weight` times as much as content and source-name matches.
+    The score is 1 - exp(-weighted_hits / saturation), so it is 0 with no
+    matches and approaches 1 as matches pile up.
+    """
+
+    def __init__(
+        self,
+        areas_of_interest: List[str],
+        synonyms: Optional[Dict[str, List[str]]] = None,
+        min_score: float = 0.15,
+        audit_rate: float = 0.0,
+        title_weight: float = 3.0,
+        saturation: float = 3.0,
+        max_content_chars: int = 20000
+    ):
+        self.areas = list(areas_of_interest)
+        self.min_score = min_score
+        self.audit_rate = audit_rate
+        self.title_weight = title_weight
+        self.saturation = saturation
+        self.max_content_chars = max_content_chars
+
+        synonyms = synonyms or {}
+        groups = []
+        first_letters = set()
+        for i, area in enumerate(self.areas):
+            terms = [area] + list(synonyms.get(area, []))
+            first_letters.update(term[0].lower() for term in terms)
+            # Longest first so "threat intelligence" wins over "intelligence"
+            alternatives = "|".join(
+                self._term_pattern(term) for term in sorted(set(terms), key=len, reverse=True)
+            )
+            groups.append(f"(?P<area{i}>{alternatives})")
+        # Only try the alternatives at words starting with a term's first letter
+        self.pattern = re.compile(
+            r"\b(?=[" + re.escape("".join(sorted(first_letters))) + r"])(?:" + "|".join(groups) + r")(?:s|es)?\b",
+            re.IGNORECASE
+        )
+
+    @staticmethod
+    def _term_pattern(term: str) -> str:
+        prefix = term.endswith("*")
+        words = term.rstrip("*").lower().split()
+        pattern = r"[\s\-]+".join(re.escape(word) for word in words)
+        return pattern + r"\w*" if prefix else pattern
+
+    def _matches(self, text: str) -> Dict[str, int]:
+        """Hit counts per area"""
+        counts: Dict[str, int] = {}
+        for match in self.pattern.finditer(text):
+            area = self.areas[int(match.lastgroup[4:])]
+            counts[area] = counts.get(area, 0) + 1
+        return counts
+
+    def count_matches(self, text: str) -> int:
+        """Total interest-area term hits in `text`"""
+        return sum(1 for _ in self.pattern.finditer(text or ""))
+
+    def score(self, title: str, content: str, source: str = "") -> Tuple[float, List[str]]:
+        """Local relevance score (0.0-1.0) and the areas that matched"""
+        title_hits = self._matches(title or "")
+        # Specialist sources ("Journal of Cybersecurity") often publish short
+        # abstracts, so the source name counts like a line of content
+        content_hits = self._matches(f"{source or ''}\n{(content or '')[:self.max_content_chars]}")
+
+        weighted = self.title_weight * sum(title_hits.values()) + sum(content_hits.values())
+        score = 1 - math.exp(-weighted / self.saturation)
+        areas = sorted(set(title_hits) | set(content_hits), key=self.areas.index)
+        return round(score, 3), areas
+
+    def _is_audited(self, url: str) -> bool:
+        """Stable sample of below-floor articles still sent to the LLM"""
+        if self.audit_rate <= 0:
+            return False
+        bucket = int(hashlib.md5(url.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+        return bucket < self.audit_rate
+
+    def split(self, articles: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split articles into (escalate, skipped)
+
+        Escalated articles carry "prefilter_score" (and "prefilter_audit"
+        if they were below the floor but sampled for auditing). Skipped
+        articles already contain a complete analysis built from the local
+        score, so they can be stored without an LLM call.
+        """
+        escalate = []
+        skipped = []
+        for article in articles:
+            score, areas = self.score(
+                article.get("title", ""), article.get("content", ""), article.get("source", "")
+            )
+            if score >= self.min_score:
+                escalate.append({**article, "prefilter_score": score})
+            elif self._is_audited(article.get("url", "")):
+                escalate.append({**article, "prefilter_score": score, "prefilter_audit": True})
+            else:
+                skipped.append({
+                    **article,
+                    "prefilter_score": score,
+                    "prefilter_skipped": True,
+                    "relevant": False,
+                    "relevance_score": score,
+                    "areas_of_interest": areas,
+                    "summary": f"Skipped by keyword pre-filter (local score {score:.2f})"
+                })
+        return escalate, skipped
+
+    def report(self, analyzed_articles: List[Dict]) -> Dict:
+        """
+        Skip rate and agreement between the local floor and the LLM
+
+        Agreement counts LLM-analyzed articles where "local score >= floor"
+        and "LLM says relevant" match. Audited articles are the ones that
+        would have been skipped, so `audit_missed` estimates how many
+        relevant articles the floor throws away.
+        """
+        total = len(analyzed_articles)
+        skipped = [a for a in analyzed_articles if a.get("prefilter_skipped")]
+        llm_checked = [a for a in analyzed_articles if "prefilter_score" in a and not a.get("prefilter_skipped")]
+        audited = [a for a in llm_checked if a.get("prefilter_audit")]
+        escalated = [a for a in llm_checked if not a.get("prefilter_audit")]
+
+        agreeing = sum(
+            1 for a in llm_checked
+            if (a["prefilter_score"] >= self.min_score) == bool(a.get("relevant"))
+        )
+        return {
+            "total": total,
+            "skipped": len(skipped),
+            "skip_rate": len(skipped) / total if total else 0.0,
+            "escalated": len(escalated),
+            "escalated_relevant": sum(1 for a in escalated if a.get("relevant")),
+            "audited": len(audited),
+            "audit_missed": sum(1 for a in audited if a.get("relevant")),
+            "agreement": agreeing / len(llm_checked) if llm_checked else None
+        }
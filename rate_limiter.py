@@ -0,0 +1,158 @@
+"""
+Rate limiting: token buckets, per-host politeness and adaptive concurrency
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate  # Tokens added per second
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        """Wait until `amount` tokens are available and take them"""
+        # A request larger than the bucket could never be satisfied
+        amount = min(amount, self.capacity)
+        # The lock queues waiters so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+class HostRateLimiter:
+    def __init__(
+        self,
+        default_rate: Optional[float],
+        default_burst: int = 1,
+        crawl_delay_lookup: Optional[Callable[[str], Awaitable[Optional[float]]]] = None
+    ):
+        """
+        Args:
+            default_rate: Requests per second per host, or None for no limit
+                unless a host is configured or its robots.txt asks for one
+            crawl_delay_lookup: Optional coroutine returning the Crawl-delay
+                for the host of the URL it is given
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.crawl_delay_lookup = crawl_delay_lookup
+        self.buckets: Dict[str, Optional[TokenBucket]] = {}  # None for unlimited hosts
+        self.overrides: Dict[str, Tuple[Optional[float], int]] = {}
+        self.crawl_delays: Dict[str, Optional[float]] = {}
+        self._setup_locks: Dict[str, asyncio.Lock] = {}
+
+    def configure(self, netloc: str, rate: Optional[float] = None, burst: Optional[int] = None):
+        """Set a host-specific budget, adjusting its bucket if it already exists"""
+        if rate is None and burst is None:
+            return
+        self.overrides[netloc] = (
+            rate if rate is not None else self.default_rate,
+            burst if burst is not None else self.default_burst
+        )
+        if netloc in self.buckets:
+            self._apply_budget(netloc)
+
+    def _apply_budget(self, netloc: str) -> Optional[TokenBucket]:
+        """Create, adjust or drop the host's bucket to match its current budget"""
+        rate, burst = self.overrides.get(netloc, (self.default_rate, self.default_burst))
+
+        # A robots.txt Crawl-delay can only make the budget stricter
+        crawl_delay = self.crawl_delays.get(netloc)
+        if crawl_delay and crawl_delay > 0 and (rate is None or 1 / crawl_delay < rate):
+            rate, burst = 1 / crawl_delay, 1
+
+        bucket = self.buckets.get(netloc)
+        if rate is None:
+            bucket = None
+        elif bucket is None:
+            bucket = TokenBucket(rate, burst)
+        else:
+            bucket.rate = rate
+            bucket.capacity = max(1, burst)
+            bucket.tokens = min(bucket.tokens, bucket.capacity)
+        self.buckets[netloc] = bucket
+        return bucket
+
+    async def _get_bucket(self, url: str) -> Optional[TokenBucket]:
+        netloc = urlparse(url).netloc
+        if netloc in self.buckets:
+            return self.buckets[netloc]
+
+        lock = self._setup_locks.setdefault(netloc, asyncio.Lock())
+        async with lock:
+            if netloc in self.buckets:
+                return self.buckets[netloc]
+            if self.crawl_delay_lookup:
+                self.crawl_delays[netloc] = await self.crawl_delay_lookup(url)
+            return self._apply_budget(netloc)
+
+    async def acquire(self, url: str):
+        """Wait for the host of `url` to allow another request"""
+        bucket = await self._get_bucket(url)
+        if bucket:
+            await bucket.acquire()
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit with additive increase / multiplicative decrease
+
+    The limit halves whenever the downstream service signals overload and
+    grows back by one slot after each window of `limit` successes. A burst
+    of overload responses to requests sent under the old limit halves it
+    only once: pass on_overload the `decreases` value read when the request
+    was sent, and signals from before the last decrease are ignored.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self.decreases = 0  # Number of times the limit has been cut
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait for a free slot"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self):
+        """Give a slot back"""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def on_success(self):
+        """Record a success, growing the limit after a full window of them"""
+        async with self._condition:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify_all()
+
+    async def on_overload(self, sent_at: Optional[int] = None):
+        """
+        Record a rate-limit response, halving the limit
+
+        `sent_at` is the `decreases` count when the failed request was sent;
+        if the limit has been cut since, this response was already accounted for.
+        """
+        async with self._condition:
+            if sent_at is not None and sent_at < self.decreases:
+                return
+            self.limit = max(self.min_limit, self.limit // 2)
+            self.decreases += 1
+            self._successes = 0
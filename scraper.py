@@ -3,37 +3,144 @@ Web scraper for news websites and RSS feeds
 """
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
-from urllib.parse import urljoin, urlparse
-import time
-import feedparser
-from datetime import datetime
-from config import NEWS_SOURCES, COMMON_SELECTORS, SCRAPER_CONFIG
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from config import NEWS_SOURCES, SCRAPER_CONFIG
+from http_cache import HTTPValidatorCache
+from parsing import (
+    PageContent, ParsingExecutor, parse_article_content, parse_article_links, parse_rss_feed
+)
+from rate_limiter import HostRateLimiter
 
 class NewsScraper:
-    def __init__(self):
+    def __init__(self, known_url_lookup: Optional[Callable[[List[str]], Awaitable[Set[str]]]] = None):
+        """
+        Args:
+            known_url_lookup: Optional coroutine returning which of the given
+                URLs are already stored; those article pages are not fetched
+        """
         self.config = SCRAPER_CONFIG
+        self.known_url_lookup = known_url_lookup
         self.session: Optional[aiohttp.ClientSession] = None
+        self.http_cache: Optional[HTTPValidatorCache] = None
+        # Validators of source pages fetched this run, kept until the source
+        # finishes so a failed scrape doesn't turn into a 304 next time
+        self._pending_validators: Dict[str, Dict[str, str]] = {}
+        self.not_modified_count = 0
+        
+        cache_path = self.config.get("http_cache_path")
+        if cache_path:
+            self.http_cache = HTTPValidatorCache(
+                cache_path,
+                max_entries=self.config.get("http_cache_max_entries")
+            )
+        
+        self.parser = ParsingExecutor(
+            mode=self.config.get("parser_executor", "process"),
+            max_workers=self.config.get("parser_workers")
+        )
+        
+        # Politeness is enforced per host: request_delay is the default
+        # interval between requests to the same host (0 for none, though
+        # per-source rate_limit settings and Crawl-delays still apply)
+        request_delay = self.config.get("request_delay", 1.0)
+        self.rate_limiter = HostRateLimiter(
+            default_rate=1 / request_delay if request_delay and request_delay > 0 else None,
+            default_burst=self.config.get("host_burst", 1),
+            crawl_delay_lookup=self._fetch_crawl_delay if self.config.get("respect_crawl_delay") else None
+        )
     
     async def __aenter__(self):
         headers = {"User-Agent": self.config["user_agent"]}
         self.session = aiohttp.ClientSession(
             headers=headers,
-            timeout=aiohttp.ClientTimeout(total=self.config["timeout"])
+            timeout=aiohttp.ClientTimeout(total=self.config["timeout"]),
+            connector=aiohttp.TCPConnector(limit_per_host=self.config.get("max_connections_per_host", 4))
         )
+        if self.http_cache:
+            self.http_cache.load()
+        self.parser.start()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
+        self.parser.shutdown()
+        # Only persist validators from a completed run, otherwise a 304 next
+        # time would hide articles that were fetched but never stored
+        # (validators of sources that failed are never added, see _commit_validators)
+        if self.http_cache and exc_type is None:
+            self.http_cache.save()
+    
+    async def _fetch_crawl_delay(self, url: str) -> Optional[float]:
+        """Read the Crawl-delay for our user agent from the robots.txt of `url`'s host"""
+        parsed = urlparse(url)
+        netloc = parsed.netloc
+        robots_url = f"{parsed.scheme or 'https'}://{netloc}/robots.txt"
+        try:
+            async with self.session.get(robots_url) as response:
+                if response.status != 200:
+                    return None
+                parser = RobotFileParser()
+                parser.parse((await response.text()).splitlines())
+                delay = parser.crawl_delay(self.config["user_agent"])
+                return float(delay) if delay is not None else None
+        except Exception as e:
+            print(f"Could not read robots.txt for {netloc}: {str(e)}")
+            return None
+    
+    def _configure_host_limits(self, source_config: Dict):
+        """Apply a source's rate_limit settings to its host"""
+        limits = source_config.get("rate_limit")
+        if not limits:
+            return
+        netloc = urlparse(source_config["url"]).netloc
+        self.rate_limiter.configure(
+            netloc,
+            rate=limits.get("requests_per_second"),
+            burst=limits.get("burst")
+        )
     
-    async def fetch_page(self, url: str) -> Optional[str]:
-        """Fetch HTML content from URL"""
+    async def fetch_page(self, url: str, conditional: bool = False) -> Optional[str]:
+        """
+        Fetch HTML content from URL
+        
+        With `conditional`, the request carries the URL's stored validators
+        and returns None if it is unchanged since the last fetch; validators
+        from the response are held until _commit_validators(url).
+        """
+        return await self._fetch(url, raw=False, conditional=conditional)
+    
+    async def fetch_raw(self, url: str, conditional: bool = False) -> Optional[bytes]:
+        """Fetch undecoded response bytes from URL, for handing to the parser (see fetch_page)"""
+        return await self._fetch(url, raw=True, conditional=conditional)
+    
+    def _commit_validators(self, url: str):
+        """Keep the validators of a source page whose articles were all fetched"""
+        validators = self._pending_validators.pop(url, None)
+        if validators is not None and self.http_cache:
+            self.http_cache.update(url, validators)
+    
+    async def _fetch(self, url: str, raw: bool, conditional: bool = False) -> Optional[PageContent]:
+        conditional = conditional and self.http_cache is not None
+        headers = self.http_cache.request_headers(url) if conditional else {}
         try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    return await response.text()
+            await self.rate_limiter.acquire(url)
+            async with self.session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    self.not_modified_count += 1
+                    if conditional:
+                        self.http_cache.touch(url)
+                    return None
+                elif response.status == 200:
+                    body = await response.read() if raw else await response.text()
+                    if conditional:
+                        self._pending_validators[url] = {
+                            name: response.headers[name]
+                            for name in ("ETag", "Last-Modified") if name in response.headers
+                        }
+                    return body
                 else:
                     print(f"Error fetching {url}: Status {response.status}")
                     return None
@@ -44,171 +151,46 @@ class NewsScraper:
             print(f"Exception fetching {url}: {str(e)}")
             return None
     
-    def extract_article_links(self, html: str, source_config: Dict) -> List[str]:
+    def extract_article_links(self, html: PageContent, source_config: Dict) -> List[str]:
         """Extract article links from homepage"""
-        soup = BeautifulSoup(html, 'lxml')
-        selectors = source_config.get("selectors", COMMON_SELECTORS)
-        link_selector = selectors.get("article_links", "a")
-        
-        links = []
-        base_url = source_config["url"]
-        base_domain = urlparse(base_url).netloc
-        
-        for link in soup.select(link_selector):
-            href = link.get('href')
-            if href:
-                # Convert relative URLs to absolute
-                full_url = urljoin(base_url, href)
-                # Only include URLs from the same domain
-                if urlparse(full_url).netloc == base_domain:
-                    links.append(full_url)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_links = []
-        for link in links:
-            if link not in seen:
-                seen.add(link)
-                unique_links.append(link)
-        
-        return unique_links[:self.config["max_articles_per_site"]]
+        return parse_article_links(html, source_config, self.config["max_articles_per_site"])
     
-    def extract_article_content(self, html: str, source_config: Dict) -> Dict[str, Optional[str]]:
+    def extract_article_content(self, html: PageContent, source_config: Dict) -> Dict[str, Optional[str]]:
         """Extract article title, content, and date"""
-        soup = BeautifulSoup(html, 'lxml')
-        selectors = source_config.get("selectors", COMMON_SELECTORS)
-        
-        # Extract title
-        title = None
-        title_selectors = [
-            selectors.get("title"),
-            "h1",
-            ".article-title",
-            ".post-title",
-            ".headline",
-            "title"
-        ]
-        for selector in title_selectors:
-            if selector:
-                element = soup.select_one(selector)
-                if element:
-                    title = element.get_text(strip=True)
-                    if title and len(title) > 5:  # Ensure meaningful title
-                        break
-        
-        # Extract content
-        content = None
-        content_selectors = [
-            selectors.get("content"),
-            "article",
-            "main",
-            ".content",
-            ".article-content",
-            ".post-content",
-            ".entry-content"
-        ]
-        for selector in content_selectors:
-            if selector:
-                element = soup.select_one(selector)
-                if element:
-                    # Remove script and style elements
-                    for script in element(["script", "style", "nav", "footer", "header", "aside"]):
-                        script.decompose()
-                    content = element.get_text(separator="\n", strip=True)
-                    if len(content) > 100:  # Ensure we have substantial content
-                        break
-        
-        # Extract date
-        date = None
-        date_selectors = [
-            selectors.get("date"),
-            "time",
-            ".date",
-            ".published-date",
-            ".article-date",
-            "[datetime]"
-        ]
-        for selector in date_selectors:
-            if selector:
-                element = soup.select_one(selector)
-                if element:
-                    date = element.get('datetime') or element.get_text(strip=True)
-                    if date:
-                        break
-        
-        return {
-            "title": title or "No title found",
-            "content": content or "",
-            "date": date
-        }
+        return parse_article_content(html, source_config, self.config.get("extraction_engine", "lxml"))
     
     async def scrape_rss_feed(self, source_config: Dict) -> List[Dict]:
         """Scrape articles from an RSS feed"""
         feed_url = source_config["url"]
         
         try:
-            # Fetch RSS feed
-            feed_content = await self.fetch_page(feed_url)
+            # Fetch RSS feed (None on error or 304 Not Modified, so skip parsing)
+            feed_content = await self.fetch_raw(feed_url, conditional=True)
             if not feed_content:
                 return []
             
-            # Parse RSS feed
-            feed = feedparser.parse(feed_content)
-            
-            if feed.bozo and feed.bozo_exception:
-                print(f"RSS parsing error for {source_config['name']}: {feed.bozo_exception}")
-                return []
-            
-            articles = []
+            # Parse RSS feed off the event loop
             max_articles = self.config.get("max_articles_per_site", 50)
+            parsed = await self.parser.run(parse_rss_feed, feed_content, source_config, max_articles)
             
-            for entry in feed.entries[:max_articles]:
-                # Extract article data from RSS entry
-                title = entry.get("title", "No title")
-                link = entry.get("link", "")
-                
-                # Get content - try different fields
-                content = ""
-                if "content" in entry:
-                    content = entry.content[0].value if isinstance(entry.content, list) else str(entry.content)
-                elif "summary" in entry:
-                    content = entry.summary
-                elif "description" in entry:
-                    content = entry.description
-                
-                # Get published date
-                published_date = None
-                if "published_parsed" in entry and entry.published_parsed:
-                    try:
-                        published_date = datetime(*entry.published_parsed[:6]).isoformat()
-                    except:
-                        pass
-                elif "published" in entry:
-                    published_date = entry.published
-                
-                # Clean HTML from content if present
-                if content:
-                    soup = BeautifulSoup(content, 'html.parser')
-                    content = soup.get_text(separator="\n", strip=True)
-                
-                if title and link:
-                    articles.append({
-                        "url": link,
-                        "source": source_config["name"],
-                        "title": title,
-                        "content": content,
-                        "date": published_date
-                    })
+            if parsed["error"]:
+                print(f"RSS parsing error for {source_config['name']}: {parsed['error']}")
+                return []
             
-            return articles
+            self._commit_validators(feed_url)
+            return parsed["articles"]
             
         except Exception as e:
             print(f"Error parsing RSS feed {source_config['name']}: {str(e)}")
             return []
+        finally:
+            # Drops the validators unless they were committed above
+            self._pending_validators.pop(feed_url, None)
     
     async def scrape_source(self, source_config: Dict) -> List[Dict]:
         """Scrape articles from a single news source (RSS or HTML)"""
         print(f"Scraping {source_config['name']}...")
+        self._configure_host_limits(source_config)
         
         # Check if this is an RSS feed
         is_rss = source_config.get("is_rss", False)
@@ -226,59 +208,116 @@ class NewsScraper:
             return articles
         
         # Otherwise, scrape HTML
+        try:
+            return await self._scrape_html_source(source_config)
+        finally:
+            # Drops the homepage validators unless every article was fetched
+            self._pending_validators.pop(source_config["url"], None)
+    
+    async def _scrape_html_source(self, source_config: Dict) -> List[Dict]:
+        """Scrape a source's homepage and the article pages it links to"""
         # Fetch homepage
-        html = await self.fetch_page(source_config["url"])
+        html = await self.fetch_raw(source_config["url"], conditional=True)
         if not html:
             return []
         
         # Extract article links
-        article_links = self.extract_article_links(html, source_config)
+        article_links = await self.parser.run(
+            parse_article_links, html, source_config, self.config["max_articles_per_site"]
+        )
         print(f"Found {len(article_links)} articles on {source_config['name']}")
         
-        # Scrape each article
-        articles = []
-        for i, link in enumerate(article_links):
-            if i > 0:
-                await asyncio.sleep(self.config["request_delay"])
-            
-            article_html = await self.fetch_page(link)
-            if article_html:
-                content = self.extract_article_content(article_html, source_config)
-                if content.get("content"):  # Only add if we got content
-                    articles.append({
-                        "url": link,
-                        "source": source_config["name"],
-                        **content
-                    })
+        # Don't download articles we already have
+        if self.known_url_lookup and article_links:
+            known = await self.known_url_lookup(article_links)
+            if known:
+                article_links = [link for link in article_links if link not in known]
+                print(f"Skipping {len(known)} already stored articles on {source_config['name']}")
+        
+        # Scrape articles concurrently, bounded per source (per-host connection
+        # limits and rate limits still apply inside fetch_page)
+        semaphore = asyncio.Semaphore(self.config.get("article_concurrency", 5))
+        failed_fetches = 0
+        
+        async def scrape_article(link: str) -> Optional[Dict]:
+            nonlocal failed_fetches
+            async with semaphore:
+                article_html = await self.fetch_raw(link)
+            if not article_html:
+                failed_fetches += 1
+                return None
+            content = await self.parser.run(
+                parse_article_content, article_html, source_config, self.config.get("extraction_engine", "lxml")
+            )
+            if not content.get("content"):  # Only add if we got content
+                return None
+            return {
+                "url": link,
+                "source": source_config["name"],
+                **content
+            }
         
+        # gather keeps results in the original link order
+        results = await asyncio.gather(*(scrape_article(link) for link in article_links))
+        articles = [article for article in results if article]
+        
+        # A 304 on the homepage next run skips all of its links, so only keep
+        # its validators once none of them is left to retry
+        if not failed_fetches:
+            self._commit_validators(source_config["url"])
         return articles
     
+    async def iter_scraped_sources(
+        self, sources: List[Dict]
+    ) -> AsyncIterator[Tuple[Dict, List[Dict], Optional[Exception]]]:
+        """
+        Scrape sources with a sliding window of concurrent workers
+        
+        Keeps up to `concurrent_sources` sources in flight and starts the next
+        one as soon as any finishes. Yields (source_config, articles, error)
+        in completion order.
+        """
+        concurrency = max(1, min(self.config.get("concurrent_sources", 10), len(sources)))
+        pending: asyncio.Queue = asyncio.Queue()
+        for source in sources:
+            pending.put_nowait(source)
+        completed: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        
+        async def worker():
+            while True:
+                try:
+                    source = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    articles = await self.scrape_source(source)
+                    await completed.put((source, articles, None))
+                except Exception as e:
+                    await completed.put((source, [], e))
+        
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for _ in range(len(sources)):
+                yield await completed.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
     async def scrape_all_sources(self, sources: List[Dict]) -> List[Dict]:
         """Scrape all news sources with concurrency control"""
         all_articles = []
+        done = 0
         
-        # Process sources in batches to avoid overwhelming servers
-        batch_size = self.config.get("concurrent_sources", 10)
-        batch_delay = self.config.get("batch_delay", 5.0)
+        async for source, articles, error in self.iter_scraped_sources(sources):
+            done += 1
+            if error:
+                print(f"[{done}/{len(sources)}] Error scraping {source['name']}: {str(error)}")
+            else:
+                print(f"[{done}/{len(sources)}] Finished {source['name']}: {len(articles)} articles")
+                all_articles.extend(articles)
         
-        for i in range(0, len(sources), batch_size):
-            batch = sources[i:i + batch_size]
-            print(f"\nProcessing batch {i//batch_size + 1} ({len(batch)} sources)...")
-            
-            tasks = [self.scrape_source(source) for source in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for j, result in enumerate(results):
-                if isinstance(result, Exception):
-                    print(f"Error scraping {batch[j]['name']}: {str(result)}")
-                else:
-                    all_articles.extend(result)
-            
-            # Delay between batches
-            if i + batch_size < len(sources):
-                print(f"Waiting {batch_delay} seconds before next batch...")
-                await asyncio.sleep(batch_delay)
+        if self.not_modified_count:
+            print(f"\n{self.not_modified_count} pages unchanged since last run (HTTP 304)")
         
         return all_articles
-
-
@@ -7,10 +7,8 @@ from database import NewsDatabase
 
 async def view_statistics():
     """Display database statistics"""
-    db = NewsDatabase()
-    await db.initialize()
-    
-    stats = await db.get_statistics()
+    async with NewsDatabase() as db:
+        stats = await db.get_statistics()
     
     print("=" * 60)
     print("Database Statistics")
@@ -32,12 +30,42 @@ async def view_statistics():
         status_icon = "✓" if run['status'] == 'success' else "✗"
         print(f"{status_icon} {run['source']}: {run['articles_new']} new / {run['articles_found']} found ({run['run_date'][:19]})")
 
-async def view_articles(limit=20, min_relevance=0.0, source=None):
-    """Display articles from database"""
-    db = NewsDatabase()
-    await db.initialize()
-    
-    articles = await db.get_relevant_articles(limit=limit, min_relevance=min_relevance, source=source)
+async def rebuild_statistics():
+    """Recount the statistics counters from the articles table, then display them"""
+    async with NewsDatabase() as db:
+        await db.rebuild_statistics()
+    print("Statistics rebuilt from the articles table\n")
+    await view_statistics()
+
+async def view_articles(limit=20, min_relevance=0.0, source=None, area=None, after=None, page=None):
+    """Display one keyset page of articles (from `after`, or page `page`, else the first)"""
+    next_cursor = None
+    if after:
+        try:
+            NewsDatabase._parse_cursor(after)
+        except ValueError as e:
+            print(f"{str(e)} (use the value printed after \"Next page: --after\")")
+            return
+    async with NewsDatabase() as db:
+        if area:
+            articles = await db.get_articles_by_area(area, limit=limit, min_relevance=min_relevance)
+        else:
+            # Every page, the first included, comes from get_articles_page so
+            # they all share one order and the printed cursor continues it.
+            # Page N is reached by following N-1 cursors; --after jumps there directly
+            articles, next_cursor = await db.get_articles_page(
+                limit, min_relevance=min_relevance, source=source, after=after
+            )
+            for _ in range((page or 1) - 1):
+                if not next_cursor:
+                    articles = []
+                    break
+                articles, next_cursor = await db.get_articles_page(
+                    limit, min_relevance=min_relevance, source=source, after=next_cursor
+                )
+        for article in articles:
+            if article.get('cluster_id'):
+                article['also_reported_by'] = await db.get_cluster_members(article['cluster_id'], exclude_url=article['url'])
     
     if not articles:
         print("No articles found matching criteria.")
@@ -61,6 +89,66 @@ async def view_articles(limit=20, min_relevance=0.0, source=None):
             print(f"   Summary: {summary}")
         print(f"   Scraped: {article['scraped_date'][:19] if article.get('scraped_date') else 'N/A'}")
         print(f"   URL: {article['url']}")
+        if article.get('also_reported_by'):
+            sources = list(dict.fromkeys(member['source'] for member in article['also_reported_by']))
+            print(f"   Also reported by: {', '.join(sources)}")
+    
+    if next_cursor:
+        print(f"\nNext page: --after {next_cursor}")
+
+async def view_areas(min_relevance=None):
+    """Display article counts per area of interest"""
+    async with NewsDatabase() as db:
+        counts = await db.count_articles_by_area(min_relevance=min_relevance)
+    
+    print("=" * 60)
+    print("Articles by area of interest" + (f" (score >= {min_relevance})" if min_relevance is not None else ""))
+    print("=" * 60)
+    for area, count in counts.items():
+        print(f"  {area}: {count}")
+
+async def search_articles(query, limit=20, min_relevance=None, since=None):
+    """Display full-text search results, best matches first"""
+    async with NewsDatabase() as db:
+        articles = await db.search(query, limit=limit, min_relevance=min_relevance, since=since)
+    
+    if not articles:
+        print(f"No articles found matching: {query}")
+        return
+    
+    print("=" * 60)
+    print(f"Search results for: {query} ({len(articles)} shown)")
+    print("=" * 60)
+    
+    for i, article in enumerate(articles, 1):
+        print(f"\n{i}. {article['title']}")
+        print(f"   Source: {article['source']}")
+        if article.get('relevance_score') is not None:
+            print(f"   Relevance Score: {article['relevance_score']:.2f}")
+        print(f"   Scraped: {article['scraped_date'][:19] if article.get('scraped_date') else 'N/A'}")
+        if article.get('snippet'):
+            print(f"   Match: {' '.join(article['snippet'].split())}")
+        print(f"   URL: {article['url']}")
+
+def parse_search_args(args):
+    """Split `search` arguments into the query and its --min-score/--since/--limit options"""
+    options = {"limit": 20, "min_relevance": None, "since": None}
+    terms = []
+    i = 0
+    while i < len(args):
+        if args[i] in ("--min-score", "--since", "--limit") and i + 1 < len(args):
+            value = args[i + 1]
+            if args[i] == "--min-score":
+                options["min_relevance"] = float(value)
+            elif args[i] == "--since":
+                options["since"] = value
+            else:
+                options["limit"] = int(value)
+            i += 2
+        else:
+            terms.append(args[i])
+            i += 1
+    return " ".join(terms), options
 
 async def view_top_relevant(limit=10):
     """Display top relevant articles"""
@@ -69,38 +157,81 @@ async def view_top_relevant(limit=10):
     print("=" * 60)
     await view_articles(limit=limit, min_relevance=0.7)
 
+def parse_paging_args(args):
+    """Remove --after CURSOR / --page N from the arguments and return (args, after, page)"""
+    remaining, after, page = [], None, None
+    i = 0
+    while i < len(args):
+        if args[i] in ("--after", "--page") and i + 1 < len(args):
+            if args[i] == "--after":
+                after = args[i + 1]
+            else:
+                page = max(1, int(args[i + 1]))
+            i += 2
+        else:
+            remaining.append(args[i])
+            i += 1
+    return remaining, after, page
+
 async def main():
     """Main function"""
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    argv, after, page = parse_paging_args(sys.argv)
+    if len(argv) > 1:
+        command = argv[1].lower()
         
         if command == "stats":
             await view_statistics()
+        elif command == "rebuild":
+            await rebuild_statistics()
         elif command == "top":
-            limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+            limit = int(argv[2]) if len(argv) > 2 else 10
             await view_top_relevant(limit)
         elif command == "all":
-            limit = int(sys.argv[2]) if len(sys.argv) > 2 else 50
-            await view_articles(limit=limit, min_relevance=0.0)
+            limit = int(argv[2]) if len(argv) > 2 else 50
+            await view_articles(limit=limit, min_relevance=0.0, after=after, page=page)
         elif command == "relevant":
-            min_score = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
-            limit = int(sys.argv[3]) if len(sys.argv) > 3 else 20
-            await view_articles(limit=limit, min_relevance=min_score)
+            min_score = float(argv[2]) if len(argv) > 2 else 0.5
+            limit = int(argv[3]) if len(argv) > 3 else 20
+            await view_articles(limit=limit, min_relevance=min_score, after=after, page=page)
         elif command == "source":
-            if len(sys.argv) < 3:
+            if len(argv) < 3:
                 print("Usage: python view_articles.py source <source_name>")
                 print("Example: python view_articles.py source 'BBC News - World'")
                 return
-            source_name = " ".join(sys.argv[2:])
-            await view_articles(limit=50, source=source_name)
+            source_name = " ".join(argv[2:])
+            await view_articles(limit=50, source=source_name, after=after, page=page)
+        elif command == "area":
+            if len(argv) < 3:
+                await view_areas()
+                return
+            # Trailing numbers are the optional minimum score and limit
+            args = argv[2:]
+            numbers = []
+            while args and len(numbers) < 2 and args[-1].replace(".", "", 1).isdigit():
+                numbers.insert(0, args.pop())
+            area = " ".join(args)
+            min_score = float(numbers[0]) if numbers else 0.0
+            limit = int(numbers[1]) if len(numbers) > 1 else 50
+            await view_articles(limit=limit, min_relevance=min_score, area=area)
+        elif command == "search":
+            query, options = parse_search_args(argv[2:])
+            if not query:
+                print("Usage: python view_articles.py search <terms> [--min-score X] [--since YYYY-MM-DD] [--limit N]")
+                print("Example: python view_articles.py search \"supply chain\" sanctions --min-score 0.5")
+                return
+            await search_articles(query, **options)
         else:
             print(f"Unknown command: {command}")
             print("\nAvailable commands:")
             print("  stats              - Show database statistics")
+            print("  rebuild            - Recompute statistics from scratch, then show them")
             print("  top [limit]        - Show top relevant articles (default: 10)")
             print("  all [limit]        - Show all articles (default: 50)")
             print("  relevant [score] [limit] - Show articles above relevance score (default: 0.5, limit: 20)")
             print("  source <name>      - Show articles from specific source")
+            print("  area [name] [score] [limit] - Show articles in an area of interest, or counts per area")
+            print("  search <terms> [--min-score X] [--since DATE] [--limit N] - Full-text search, best matches first")
+            print("\nall, relevant and source also take --page N or --after CURSOR (printed after each page)")
     else:
         # Default: show statistics and top articles
         await view_statistics()